@@ -2,18 +2,861 @@ import tkinter as tk
 from tkinter import ttk, filedialog
 from tkinterdnd2 import DND_FILES, TkinterDnD
 import os
+import errno
 import shutil
 import mimetypes
 from pathlib import Path
 from datetime import datetime
 import json
+import csv
 import sqlite3
 import threading
+from concurrent.futures import ProcessPoolExecutor
+import queue
+import stat
 from PIL import Image
 import music_tag
 import hashlib
+import zipfile
+import tarfile
+import gzip
+import bz2
+import lzma
+import struct
+from collections import OrderedDict, deque
+import time
+import argparse
+import cProfile
+import pstats
+import contextlib
+import ctypes
+import ctypes.util
+import platform
+import sys
 from tkinter.scrolledtext import ScrolledText
 
+class PipelineStats:
+    """
+    Optional per-stage instrumentation for the organize and analyze pipelines.
+    Keeps call counters and latency histograms per stage; does nothing when disabled.
+    """
+
+    # Histogram bucket upper bounds in seconds
+    BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0, 10.0)
+
+    def __init__(self, enabled=False, profile=False):
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.stages = {}
+        self.started = time.time()
+        self.profile = enabled and profile
+        # Each thread profiles itself; finished blocks are merged here
+        self.profile_stats = None
+        self.local = threading.local()
+
+    def stage(self, name):
+        """Return a context manager timing one call of a pipeline stage"""
+        if not self.enabled:
+            return _NULL_STAGE
+        return _StageTimer(self, name)
+
+    def record(self, name, elapsed):
+        """Add one timing sample to a stage histogram"""
+        with self.lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = {
+                    'calls': 0,
+                    'total': 0.0,
+                    'max': 0.0,
+                    'buckets': [0] * (len(self.BUCKETS) + 1)
+                }
+            stats['calls'] += 1
+            stats['total'] += elapsed
+            if elapsed > stats['max']:
+                stats['max'] = elapsed
+            for i, bound in enumerate(self.BUCKETS):
+                if elapsed <= bound:
+                    stats['buckets'][i] += 1
+                    break
+            else:
+                stats['buckets'][-1] += 1
+
+    def incr(self, name, amount=1):
+        """Increment a named counter"""
+        if not self.enabled:
+            return
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    @contextlib.contextmanager
+    def profiled(self):
+        """
+        Run the enclosed block under cProfile when profiling is enabled.
+        cProfile only sees the thread that enables it, so worker threads
+        call this too; results are merged when each block ends.
+        """
+        if not self.profile or getattr(self.local, 'profiling', False):
+            yield
+            return
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # Another profiler already covers this thread
+            yield
+            return
+        self.local.profiling = True
+        try:
+            yield
+        finally:
+            profiler.disable()
+            self.local.profiling = False
+            try:
+                profile = pstats.Stats(profiler)
+            except TypeError:  # Nothing was profiled
+                profile = None
+            if profile is not None:
+                with self.lock:
+                    if self.profile_stats is None:
+                        self.profile_stats = profile
+                    else:
+                        self.profile_stats.add(profile)
+
+    def snapshot(self):
+        """Return a JSON-serializable copy of all collected stats"""
+        with self.lock:
+            stages = {}
+            for name, stats in self.stages.items():
+                stages[name] = {
+                    'calls': stats['calls'],
+                    'total_s': stats['total'],
+                    'mean_s': stats['total'] / stats['calls'],
+                    'max_s': stats['max'],
+                    'histogram': {
+                        (f"<={bound}s" if i < len(self.BUCKETS) else f">{self.BUCKETS[-1]}s"): count
+                        for i, (bound, count) in enumerate(zip(self.BUCKETS + (None,), stats['buckets']))
+                    }
+                }
+            snapshot = {
+                'enabled': self.enabled,
+                'uptime_s': time.time() - self.started,
+                'counters': dict(self.counters),
+                'stages': stages
+            }
+        if self.profile:
+            snapshot['profile'] = self.profile_top()
+        return snapshot
+
+    def profile_top(self, limit=25):
+        """Return the top profiled functions by cumulative time"""
+        # Only finished blocks are merged, so no running profiler is read
+        with self.lock:
+            if self.profile_stats is None:
+                return []
+            rows = []
+            for (filename, line, func), (cc, nc, tt, ct, callers) in self.profile_stats.stats.items():
+                rows.append({
+                    'function': f"{Path(filename).name}:{line}({func})",
+                    'calls': nc,
+                    'own_s': tt,
+                    'cumulative_s': ct
+                })
+        rows.sort(key=lambda r: r['cumulative_s'], reverse=True)
+        return rows[:limit]
+
+    def format_report(self):
+        """Render collected stats as plain text for the Stats tab"""
+        if not self.enabled:
+            return "Instrumentation is disabled.\nEnable it in settings or start with --stats.\n"
+        snapshot = self.snapshot()
+        report = "Pipeline Stats\n"
+        report += "=" * 50 + "\n\n"
+        report += f"{'Stage':<12}{'Calls':>8}{'Total s':>10}{'Mean ms':>10}{'Max ms':>10}\n"
+        for name, stats in sorted(snapshot['stages'].items(), key=lambda x: x[1]['total_s'], reverse=True):
+            report += (f"{name:<12}{stats['calls']:>8}{stats['total_s']:>10.3f}"
+                       f"{stats['mean_s'] * 1000:>10.3f}{stats['max_s'] * 1000:>10.3f}\n")
+        if snapshot['counters']:
+            report += "\nCounters:\n"
+            for name, value in sorted(snapshot['counters'].items()):
+                report += f"  {name}: {value}\n"
+        for name, stats in sorted(snapshot['stages'].items()):
+            report += f"\n{name} latency histogram:\n"
+            for bucket, count in stats['histogram'].items():
+                report += f"  {bucket:>10}: {count}\n"
+        if snapshot.get('profile'):
+            report += "\nTop functions (cumulative):\n"
+            for row in snapshot['profile'][:10]:
+                report += f"  {row['cumulative_s']:8.3f}s  {row['function']}\n"
+        return report
+
+    def dump_json(self, path):
+        """Write a stats snapshot to a JSON file"""
+        with open(path, 'w') as f:
+            json.dump(self.snapshot(), f, indent=4)
+
+class _StageTimer:
+    """Context manager recording the duration of one stage call"""
+    __slots__ = ('stats', 'name', 'start')
+
+    def __init__(self, stats, name):
+        self.stats = stats
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.stats.record(self.name, time.perf_counter() - self.start)
+        return False
+
+# Shared no-op stage used when instrumentation is disabled
+_NULL_STAGE = contextlib.nullcontext()
+
+class TokenBucket:
+    """Rate limiter allowing short bursts up to one second of budget"""
+
+    def __init__(self, rate):
+        self.rate = rate
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def take(self, amount, scale=1.0):
+        """Consume tokens and return how long the caller must wait, in seconds"""
+        rate = self.rate * scale
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(rate, self.tokens + (now - self.updated) * rate)
+            self.updated = now
+            self.tokens -= amount
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / rate
+
+class IOScheduler:
+    """
+    Throttles file operations against bytes/sec and ops/sec budgets kept
+    separately for every device touched, with optional idle I/O priority
+    for worker threads and adaptive backoff when I/O latency spikes.
+    """
+
+    COPY_CHUNK = 1024 * 1024
+    # Directories whose device id is remembered
+    DIR_CACHE_SIZE = 4096
+    # Latency above this multiple of the device baseline counts as a spike
+    SPIKE_FACTOR = 3.0
+    MIN_SCALE = 0.05
+
+    # ioprio_set syscall numbers per architecture (Linux)
+    IOPRIO_SYSCALLS = {'x86_64': 251, 'i686': 289, 'aarch64': 30, 'armv7l': 314}
+
+    def __init__(self, limits=None):
+        limits = limits or {}
+        self.bytes_per_sec = limits.get("bytes_per_sec", 0)
+        self.ops_per_sec = limits.get("ops_per_sec", 0)
+        self.device_limits = limits.get("per_device", {})
+        self.idle_priority = limits.get("idle_priority", False)
+        self.adaptive = limits.get("adaptive", False)
+        self.enabled = bool(self.bytes_per_sec or self.ops_per_sec or self.device_limits or self.adaptive)
+        
+        self.lock = threading.Lock()
+        self.devices = {}  # st_dev -> budget and latency state
+        self.dir_devices = OrderedDict()  # directory path -> st_dev, least recent first
+        self.throttled_until = 0.0
+        self.device_overrides = None
+
+    def device(self, path):
+        """Return the device id for a path, cached per parent directory"""
+        return self.dir_device(os.path.dirname(str(path)))
+
+    def dir_device(self, directory):
+        """Return the device id of a directory, cached"""
+        directory = str(directory)
+        with self.lock:
+            dev = self.dir_devices.get(directory)
+            if dev is not None:
+                self.dir_devices.move_to_end(directory)
+                return dev
+        try:
+            dev = os.stat(directory).st_dev
+        except OSError:
+            dev = -1
+        with self.lock:
+            self.dir_devices[directory] = dev
+            if len(self.dir_devices) > self.DIR_CACHE_SIZE:
+                self.dir_devices.popitem(last=False)
+        return dev
+
+    def device_state(self, dev):
+        """Return (creating if needed) the budgets and latency state for a device"""
+        state = self.devices.get(dev)
+        if state is not None:
+            return state
+        with self.lock:
+            if self.device_overrides is None:
+                # Resolve configured per-device paths to device ids once
+                self.device_overrides = {}
+                for path, limits in self.device_limits.items():
+                    try:
+                        self.device_overrides[os.stat(path).st_dev] = limits
+                    except OSError:
+                        pass
+            limits = self.device_overrides.get(dev, {})
+            bytes_rate = limits.get("bytes_per_sec", self.bytes_per_sec)
+            ops_rate = limits.get("ops_per_sec", self.ops_per_sec)
+            state = self.devices.setdefault(dev, {
+                'bytes': TokenBucket(bytes_rate) if bytes_rate else None,
+                'ops': TokenBucket(ops_rate) if ops_rate else None,
+                'scale': 1.0,
+                'latency': None,
+                'baseline': None,
+                'last_latency': 0.0
+            })
+        return state
+
+    def throttle(self, devices, nbytes=0, ops=1):
+        """Block until every device involved has budget for the operation"""
+        if not self.enabled:
+            return
+        wait = 0.0
+        for dev in set(devices):
+            state = self.device_state(dev)
+            scale = state['scale']
+            if state['bytes'] is not None and nbytes:
+                wait = max(wait, state['bytes'].take(nbytes, scale))
+            if state['ops'] is not None and ops:
+                wait = max(wait, state['ops'].take(ops, scale))
+            if scale < 1.0:
+                # Backed off: keep the device idle for a share of each operation
+                wait = max(wait, state['last_latency'] * (1.0 / scale - 1.0))
+        if wait > 0:
+            self.throttled_until = time.monotonic() + wait + 0.5
+            time.sleep(wait)
+
+    def observe(self, devices, elapsed, nbytes=0):
+        """Feed an operation's latency into the adaptive backoff"""
+        if not self.adaptive:
+            return
+        # Normalize large transfers to per-MiB latency
+        latency = elapsed / max(1.0, nbytes / self.COPY_CHUNK)
+        for dev in set(devices):
+            state = self.device_state(dev)
+            with self.lock:
+                ewma = latency if state['latency'] is None else 0.8 * state['latency'] + 0.2 * latency
+                state['latency'] = ewma
+                state['last_latency'] = latency
+                baseline = state['baseline']
+                # Baseline follows improvements quickly and degradations slowly
+                if baseline is None or ewma < baseline:
+                    state['baseline'] = ewma
+                else:
+                    state['baseline'] = 0.999 * baseline + 0.001 * ewma
+                if ewma > self.SPIKE_FACTOR * state['baseline'] and ewma > 0.001:
+                    state['scale'] = max(self.MIN_SCALE, state['scale'] * 0.5)
+                else:
+                    state['scale'] = min(1.0, state['scale'] + 0.05)
+
+    @contextlib.contextmanager
+    def operation(self, devices, nbytes=0, ops=1):
+        """Throttle, then time the enclosed operation for adaptive backoff"""
+        self.throttle(devices, nbytes, ops)
+        if not self.adaptive:
+            yield
+            return
+        start = time.perf_counter()
+        yield
+        self.observe(devices, time.perf_counter() - start, nbytes)
+
+    def scan(self, paths, root):
+        """Throttle a directory listing iterator, one op per entry"""
+        if not self.enabled:
+            yield from paths
+            return
+        # Stat the root itself so a dropped mount point is billed to its own device
+        devices = (self.dir_device(root),)
+        for path in paths:
+            self.throttle(devices)
+            yield path
+
+    def read_chunks(self, file_obj, path, chunk_size):
+        """Yield throttled chunks read from an open file"""
+        devices = (self.device(path),) if self.enabled else ()
+        while True:
+            start = time.perf_counter()
+            chunk = file_obj.read(chunk_size)
+            if not chunk:
+                return
+            # Charge the bytes actually read; the final empty read is free
+            self.observe(devices, time.perf_counter() - start, len(chunk))
+            self.throttle(devices, len(chunk), 0)
+            yield chunk
+
+    def copy_file(self, src, dest, follow_symlinks=False):
+        """Chunked, throttled replacement for shutil.copy2"""
+        if os.path.islink(src) and not follow_symlinks:
+            os.symlink(os.readlink(src), dest)
+            return dest
+        if not self.enabled:
+            return shutil.copy2(src, dest, follow_symlinks=follow_symlinks)
+        devices = (self.device(src), self.device(dest))
+        with open(src, 'rb') as fsrc, open(dest, 'wb') as fdst:
+            while True:
+                start = time.perf_counter()
+                chunk = fsrc.read(self.COPY_CHUNK)
+                if not chunk:
+                    break
+                fdst.write(chunk)
+                self.observe(devices, time.perf_counter() - start, len(chunk))
+                self.throttle(devices, len(chunk), 0)
+        shutil.copystat(src, dest, follow_symlinks=follow_symlinks)
+        return dest
+
+    def is_throttled(self):
+        """Whether work was held back in the last moment"""
+        return time.monotonic() < self.throttled_until
+
+    def enter_background(self):
+        """Lower the calling worker thread's I/O priority if configured"""
+        if not self.idle_priority:
+            return
+        try:
+            if sys.platform.startswith('linux'):
+                syscall_nr = self.IOPRIO_SYSCALLS.get(platform.machine())
+                if syscall_nr is not None:
+                    libc = ctypes.CDLL(None, use_errno=True)
+                    # IOPRIO_WHO_PROCESS with pid 0 targets the calling thread
+                    ioprio_class_idle = 3
+                    libc.syscall(syscall_nr, 1, 0, ioprio_class_idle << 13)
+                # Linux nice values are per thread; set an absolute value so
+                # threads that inherited a lowered priority don't drop further
+                current = os.getpriority(os.PRIO_PROCESS, 0)
+                os.setpriority(os.PRIO_PROCESS, 0, max(current, 10))
+            elif sys.platform == 'darwin':
+                libc = ctypes.CDLL(ctypes.util.find_library('c'))
+                # setiopolicy_np(IOPOL_TYPE_DISK, IOPOL_SCOPE_THREAD, IOPOL_THROTTLE)
+                libc.setiopolicy_np(0, 1, 3)
+        except (OSError, AttributeError):
+            pass
+
+class ContentSniffer:
+    """
+    Detects file types from their leading bytes using a trie of magic numbers.
+    Results are cached by file identity (device, inode, size, mtime).
+    """
+
+    # Bytes read from the start of each file
+    HEADER_SIZE = 512
+    CACHE_SIZE = 100000
+
+    # Each signature is a list of (offset, magic) parts that must all match
+    # and the extension it identifies. The first part is indexed in the trie.
+    SIGNATURES = [
+        ([(0, b'\x89PNG\r\n\x1a\n')], '.png'),
+        ([(0, b'\xff\xd8\xff')], '.jpg'),
+        ([(0, b'GIF87a')], '.gif'),
+        ([(0, b'GIF89a')], '.gif'),
+        ([(0, b'II*\x00')], '.tiff'),
+        ([(0, b'MM\x00*')], '.tiff'),
+        ([(0, b'RIFF'), (8, b'WEBP')], '.webp'),
+        ([(0, b'RIFF'), (8, b'WAVE')], '.wav'),
+        ([(0, b'RIFF'), (8, b'AVI ')], '.avi'),
+        ([(0, b'FORM'), (8, b'AIFF')], '.aiff'),
+        ([(0, b'8BPS')], '.psd'),
+        ([(0, b'v/1\x01')], '.exr'),
+        ([(0, b'#?RADIANCE')], '.hdr'),
+        ([(0, b'%PDF')], '.pdf'),
+        ([(0, b'%!PS')], '.eps'),
+        ([(0, b'{\\rtf')], '.rtf'),
+        ([(0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1')], '.doc'),
+        ([(0, b'PK\x03\x04')], '.zip'),
+        ([(0, b'PK\x05\x06')], '.zip'),
+        ([(0, b'Rar!\x1a\x07')], '.rar'),
+        ([(0, b'7z\xbc\xaf\x27\x1c')], '.7z'),
+        ([(0, b'\x1f\x8b')], '.gz'),
+        ([(0, b'BZh')], '.bz2'),
+        ([(0, b'\xfd7zXZ\x00')], '.xz'),
+        ([(257, b'ustar')], '.tar'),
+        ([(0, b'ID3')], '.mp3'),
+        ([(0, b'\xff\xfb')], '.mp3'),
+        ([(0, b'fLaC')], '.flac'),
+        ([(0, b'OggS')], '.ogg'),
+        ([(0, b'MThd')], '.mid'),
+        ([(4, b'ftypqt  ')], '.mov'),
+        ([(4, b'ftypM4A ')], '.m4a'),
+        ([(4, b'ftypheic')], '.heic'),
+        ([(4, b'ftypheix')], '.heic'),
+        ([(4, b'ftypmif1')], '.heic'),
+        ([(4, b'ftypavif')], '.avif'),
+        ([(4, b'ftypavis')], '.avif'),
+        ([(4, b'ftyp3gp')], '.3gp'),
+        ([(4, b'ftyp')], '.mp4'),
+        ([(0, b'\x1aE\xdf\xa3')], '.mkv'),
+        ([(0, b'\x00\x00\x01\xba')], '.mpg'),
+        ([(0, b'glTF')], '.glb'),
+        ([(0, b'BLENDER')], '.blend'),
+        ([(0, b'wOFF')], '.woff'),
+        ([(0, b'wOF2')], '.woff2'),
+        ([(0, b'OTTO')], '.otf'),
+        ([(0, b'\x00\x01\x00\x00\x00')], '.ttf'),
+        ([(0, b'<?xml')], '.xml'),
+        ([(0, b'#!/bin/sh')], '.sh'),
+        ([(0, b'#!/bin/bash')], '.sh'),
+        ([(0, b'#!/usr/bin/env python')], '.py'),
+    ]
+
+    # Extensions sharing a container format are not reported as mismatches
+    FAMILIES = [
+        {'.zip', '.docx', '.xlsx', '.pptx', '.odt', '.apk', '.jar', '.epub', '.pages',
+         '.numbers', '.key', '.usdz', '.sketch', '.ase', '.vsix', '.whl'},
+        {'.doc', '.xls', '.ppt', '.msi'},
+        {'.jpg', '.jpeg', '.jpg_medium', '.jpg_large'},
+        {'.png', '.png_small'},
+        {'.mp4', '.m4v', '.m4a', '.mov', '.3gp', '.heic', '.aac'},
+        {'.mkv', '.webm'},
+        {'.tiff', '.tif', '.raw', '.dng', '.nef', '.cr2'},
+        {'.pdf', '.ai'},
+        {'.eps', '.ps', '.ai'},
+        {'.gz', '.tgz'},
+        {'.xml', '.plist', '.svg', '.xib', '.html', '.mobileconfig', '.project'},
+        {'.sh', '.bash', '.zsh'},
+        {'.ttf', '.otf'},
+        {'.mpg', '.mpeg', '.vob'},
+        {'.aiff', '.aif'},
+        {'.mid', '.midi'},
+        {'.ogg', '.oga', '.opus'},
+        {'.blend', '.blend1'},
+    ]
+
+    def __init__(self):
+        # offset -> nested dict of bytes; None key holds [(extra parts, ext), ...]
+        self.tries = {}
+        for parts, ext in self.SIGNATURES:
+            offset, magic = parts[0]
+            node = self.tries.setdefault(offset, {})
+            for byte in magic:
+                node = node.setdefault(byte, {})
+            node.setdefault(None, []).append((parts[1:], ext))
+        self.families = {}
+        for family in self.FAMILIES:
+            for ext in family:
+                self.families.setdefault(ext, set()).update(family)
+        # Extensions whose expected contents the table knows; only these can mismatch
+        self.known = {ext for parts, ext in self.SIGNATURES}
+        for ext in list(self.known):
+            self.known.update(self.families.get(ext, ()))
+        self.cache = OrderedDict()
+        self.lock = threading.Lock()
+
+    def match(self, header):
+        """Return the extension identified by a file header, or None"""
+        for offset, root in self.tries.items():
+            node = root
+            best = None
+            # Walk the trie, remembering the deepest signature that fully matches
+            for byte in header[offset:]:
+                node = node.get(byte)
+                if node is None:
+                    break
+                for extra, ext in node.get(None, ()):
+                    if all(header[o:o + len(m)] == m for o, m in extra):
+                        best = ext
+                        break
+            if best:
+                return best
+        return None
+
+    def sniff(self, path):
+        """Return the detected extension for a file, reading its header at most once"""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        key = (st.st_dev, st.st_ino, st.st_size, st.st_mtime_ns)
+        with self.lock:
+            if key in self.cache:
+                self.cache.move_to_end(key)
+                return self.cache[key]
+        try:
+            # Single unbuffered read of the header
+            with open(path, 'rb', buffering=0) as f:
+                header = f.read(self.HEADER_SIZE)
+        except OSError:
+            return None
+        ext = self.match(header)
+        with self.lock:
+            self.cache[key] = ext
+            if len(self.cache) > self.CACHE_SIZE:
+                self.cache.popitem(last=False)
+        return ext
+
+    def is_mismatch(self, ext, detected):
+        """Whether a file's extension disagrees with its detected content type"""
+        if not ext or not detected or ext == detected or ext not in self.known:
+            return False
+        return ext not in self.families.get(detected, ())
+
+class ExportSink:
+    """
+    Streams analysis rows to a JSONL, CSV or SQLite file while a scan runs,
+    so memory use does not grow with the size of the tree. The format is
+    chosen from the file extension.
+    """
+
+    FORMATS = {'.jsonl': 'jsonl', '.csv': 'csv', '.db': 'sqlite', '.sqlite': 'sqlite'}
+    # Rows per SQLite bulk insert
+    BATCH_SIZE = 1000
+
+    def __init__(self, path, table, fields):
+        self.path = Path(path)
+        self.table = table
+        self.fields = fields
+        self.rows = 0
+        self.format = self.FORMATS.get(self.path.suffix.lower())
+        if self.format is None:
+            raise ValueError(f"Unsupported export format: {self.path.suffix} (use .jsonl, .csv or .db)")
+        
+        if self.format == 'sqlite':
+            self.conn = sqlite3.connect(str(self.path))
+            columns = ", ".join(fields)
+            # Replace earlier runs, as the JSONL and CSV formats overwrite their file
+            self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            self.conn.execute(f"CREATE TABLE {table} ({columns})")
+            self.insert_sql = f"INSERT INTO {table} ({columns}) VALUES ({', '.join('?' * len(fields))})"
+            self.batch = []
+        else:
+            self.file = open(self.path, 'w', newline='', encoding='utf-8')
+            if self.format == 'csv':
+                self.writer = csv.writer(self.file)
+                self.writer.writerow(fields)
+
+    def write(self, row):
+        """Append one row, given as a tuple in field order"""
+        if self.format == 'jsonl':
+            self.file.write(json.dumps(dict(zip(self.fields, row))) + "\n")
+        elif self.format == 'csv':
+            self.writer.writerow(row)
+        else:
+            self.batch.append(row)
+            if len(self.batch) >= self.BATCH_SIZE:
+                self.flush()
+        self.rows += 1
+
+    def flush(self):
+        """Write buffered SQLite rows in one transaction"""
+        if self.format == 'sqlite' and self.batch:
+            self.conn.executemany(self.insert_sql, self.batch)
+            self.conn.commit()
+            self.batch.clear()
+
+    def close(self):
+        """Flush remaining rows and close the output"""
+        if self.format == 'sqlite':
+            self.flush()
+            self.conn.close()
+        else:
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+class VolumeQueues:
+    """
+    Independent bounded work queues, one per output volume, each drained by
+    its own worker threads so throughput scales with the number of disks.
+    """
+
+    def __init__(self, roots, handler, workers_per_volume=1, queue_size=256, on_start=None, stats=None,
+                 on_error=print):
+        self.handler = handler
+        self.workers_per_volume = workers_per_volume
+        self.on_start = on_start
+        self.stats = stats
+        self.on_error = on_error
+        self.queues = {}
+        self.threads = []
+        for root in roots:
+            work_queue = self.queues[root] = queue.Queue(maxsize=queue_size)
+            for _ in range(workers_per_volume):
+                thread = threading.Thread(target=self.work, args=(root, work_queue), daemon=True)
+                thread.start()
+                self.threads.append(thread)
+
+    def work(self, root, work_queue):
+        """Worker loop: run the handler for each queued item until closed"""
+        if self.on_start:
+            self.on_start()
+        # Profile each worker itself; cProfile does not follow threads
+        with self.stats.profiled() if self.stats else contextlib.nullcontext():
+            while True:
+                args = work_queue.get()
+                if args is None:
+                    return
+                try:
+                    self.handler(root, *args)
+                except Exception as e:
+                    self.on_error(f"❌ Error in volume worker for {root}: {str(e)}")
+
+    def submit(self, root, *args):
+        """Queue work for a volume, blocking while its queue is full"""
+        self.queues[root].put(args)
+
+    def close(self):
+        """Wait for all queued work to finish and stop the workers"""
+        for work_queue in self.queues.values():
+            for _ in range(self.workers_per_volume):
+                work_queue.put(None)
+        for thread in self.threads:
+            thread.join()
+
+class ArchiveInspector:
+    """
+    Lists archive members without extracting them. Zip files are read from
+    their central directory, tar headers are streamed, and single-file
+    compressed streams report the name and size from their own headers.
+    """
+
+    ZIP_EXTENSIONS = {'.zip', '.apk', '.jar', '.whl'}
+    TAR_EXTENSIONS = {'.tar', '.tgz', '.tbz2', '.txz'}
+    STREAM_OPENERS = {'.gz': gzip.open, '.bz2': bz2.open, '.xz': lzma.open}
+    SUPPORTED = ZIP_EXTENSIONS | TAR_EXTENSIONS | set(STREAM_OPENERS)
+
+    def members(self, path, allow_streaming=True):
+        """
+        Return [(name, size, compressed_size), ...] or None if unsupported.
+        Without allow_streaming, compressed tars (which must be decoded to
+        reach their headers) are treated as unsupported.
+        """
+        path = str(path)
+        name = os.path.basename(path).lower()
+        ext = os.path.splitext(name)[1]
+        try:
+            if ext in self.ZIP_EXTENSIONS:
+                # infolist() comes from the central directory; no member is decompressed
+                with zipfile.ZipFile(path) as archive:
+                    return [(info.filename, info.file_size, info.compress_size)
+                            for info in archive.infolist() if not info.is_dir()]
+            if ext == '.tar':
+                # Uncompressed tar: headers are read and bodies skipped with seek
+                with tarfile.open(path, 'r:') as archive:
+                    return self.tar_members(archive)
+            if ext in self.TAR_EXTENSIONS or name.endswith(('.tar.gz', '.tar.bz2', '.tar.xz')):
+                return self.stream_tar_members(path) if allow_streaming else None
+            if ext in self.STREAM_OPENERS:
+                return self.stream_members(path, ext, allow_streaming)
+        except Exception:
+            # Corrupt archives surface as zlib.error, NotImplementedError and
+            # others besides the module errors; any of them means "unreadable"
+            return None
+        return None
+
+    def tar_members(self, archive):
+        """Collect regular-file members from an open tar archive"""
+        return [(member.name, member.size, None) for member in archive if member.isfile()]
+
+    def stream_tar_members(self, path):
+        """
+        Stream headers of a compressed tar. The compressed stream still has
+        to be decoded to reach each header, but bodies are never stored.
+        """
+        with tarfile.open(path, 'r|*') as archive:
+            return self.tar_members(archive)
+
+    def stream_members(self, path, ext, allow_streaming=True):
+        """Describe a single-file .gz/.bz2/.xz, detecting compressed tars"""
+        # A tar inside shows the ustar magic in its first 512-byte header
+        with self.STREAM_OPENERS[ext](path) as stream:
+            header = stream.read(512)
+        if header[257:262] == b'ustar':
+            return self.stream_tar_members(path) if allow_streaming else None
+        
+        inner_name = os.path.basename(path)[:-len(ext)]
+        if ext != '.gz':
+            # bz2 and xz do not record the original size up front
+            return [(inner_name, None, os.path.getsize(path))]
+        with open(path, 'rb') as f:
+            head = f.read(10)
+            flags = head[3]
+            if flags & 0x04:  # FEXTRA
+                extra_len = struct.unpack('<H', f.read(2))[0]
+                f.seek(extra_len, os.SEEK_CUR)
+            if flags & 0x08:  # FNAME
+                raw = bytearray()
+                while (byte := f.read(1)) not in (b'', b'\x00'):
+                    raw += byte
+                inner_name = raw.decode('latin-1') or inner_name
+            # ISIZE trailer holds the uncompressed size modulo 2**32
+            f.seek(-4, os.SEEK_END)
+            size = struct.unpack('<I', f.read(4))[0]
+        return [(inner_name, size, os.path.getsize(path))]
+
+def compute_dhash(path):
+    """
+    Compute a 64-bit difference hash of an image. Runs in worker processes,
+    so it is a module-level function. Returns (path, hash) or (path, None).
+    """
+    try:
+        with Image.open(path) as img:
+            # Let JPEG decode at reduced scale, since only 9x8 pixels are needed
+            img.draft('L', (64, 64))
+            pixels = list(img.convert('L').resize((9, 8)).getdata())
+    except Exception:
+        return path, None
+    value = 0
+    for row in range(8):
+        for col in range(8):
+            left = pixels[row * 9 + col]
+            right = pixels[row * 9 + col + 1]
+            value = (value << 1) | (left > right)
+    return path, value
+
+class BKTree:
+    """BK-tree over 64-bit hashes for sublinear Hamming-distance lookups"""
+
+    def __init__(self):
+        self.root = None  # [hash, items, {distance: child}]
+        self.size = 0
+
+    def add(self, value, item):
+        """Insert an item under its hash"""
+        self.size += 1
+        if self.root is None:
+            self.root = [value, [item], {}]
+            return
+        node = self.root
+        while True:
+            distance = (value ^ node[0]).bit_count()
+            if distance == 0:
+                node[1].append(item)
+                return
+            child = node[2].get(distance)
+            if child is None:
+                node[2][distance] = [value, [item], {}]
+                return
+            node = child
+
+    def search(self, value, radius):
+        """Return (distance, item) for all items within radius of a hash"""
+        results = []
+        if self.root is None:
+            return results
+        stack = [self.root]
+        while stack:
+            node = stack.pop()
+            distance = (value ^ node[0]).bit_count()
+            if distance <= radius:
+                results.extend((distance, item) for item in node[1])
+            # Triangle inequality: only children in this band can match
+            for child_distance, child in node[2].items():
+                if distance - radius <= child_distance <= distance + radius:
+                    stack.append(child)
+        return results
+
 # At the top of file, after imports
 # Add docstring for main class
 class FileOrganizerApp:
@@ -22,22 +865,48 @@ class FileOrganizerApp:
     Provides file categorization, search, statistics and analysis features.
     """
 
-    def __init__(self, root):
+    # Job items loaded per query and item updates written per checkpoint
+    JOB_PAGE_SIZE = 1000
+    JOB_CHECKPOINT_SIZE = 500
+    JOB_CHECKPOINT_INTERVAL = 2.0  # seconds
+    # Status messages are drawn at most this often; the debug log keeps this many lines
+    STATUS_INTERVAL = 0.1  # seconds
+    DEBUG_LOG_LINES = 2000
+
+    # Images considered for perceptual hashing
+    IMAGE_EXTENSIONS = {'.jpg', '.jpeg', '.png', '.gif', '.bmp', '.tiff', '.webp', '.heic',
+                        '.jpg_medium', '.jpg_large', '.png_small'}
+
+    # OS metadata files that are skipped when organizing folder contents
+    JUNK_FILES = {'.DS_Store', 'Thumbs.db', 'desktop.ini', '.localized'}
+
+    # Columns streamed by the analyzers to an export sink
+    EXTENSION_EXPORT_FIELDS = ('path', 'archive', 'extension', 'detected', 'mime_type', 'size', 'mismatch')
+    SIZE_EXPORT_FIELDS = ('kind', 'root', 'path', 'size', 'archive_contents_size')
+    # Mismatches listed in the on-screen report; the rest are only counted
+    MAX_REPORTED_MISMATCHES = 1000
+
+    # Directory handles are only used where the platform supports *at() calls
+    DIR_FD_SUPPORTED = hasattr(os, 'O_DIRECTORY') and {os.open, os.mkdir, os.rename, os.stat} <= os.supports_dir_fd
+
+    def __init__(self, root, stats=None):
+        """Create the app; with root=None it runs headless for command-line analysis"""
         self.root = root
-        self.root.title("clutter")
-        
-        # Smaller window size
-        window_width = 700
-        window_height = 500
-        
-        # Center window but offset to left
-        screen_width = root.winfo_screenwidth()
-        screen_height = root.winfo_screenheight()
-        x = (screen_width - window_width) // 2 - 100  # Offset 100 pixels to left
-        y = (screen_height - window_height) // 2
-        
-        # Set window geometry with new size and position
-        self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
+        if root is not None:
+            self.root.title("clutter")
+            
+            # Smaller window size
+            window_width = 700
+            window_height = 500
+            
+            # Center window but offset to left
+            screen_width = root.winfo_screenwidth()
+            screen_height = root.winfo_screenheight()
+            x = (screen_width - window_width) // 2 - 100  # Offset 100 pixels to left
+            y = (screen_height - window_height) // 2
+            
+            # Set window geometry with new size and position
+            self.root.geometry(f"{window_width}x{window_height}+{x}+{y}")
         
         # Initialize database
         self.init_database()
@@ -46,6 +915,46 @@ class FileOrganizerApp:
         self.config_file = Path.home() / ".file_organizer_config.json"
         self.load_config()
         
+        # Pipeline instrumentation (no-op unless enabled)
+        self.stats = stats or PipelineStats(enabled=self.config.get("instrumentation", False))
+        
+        # I/O budgets shared by all file operations
+        self.io = IOScheduler(self.config.get("io_limits"))
+        
+        # Output volume placement state
+        self.placement_lock = threading.Lock()
+        self.round_robin = {}  # category -> next root index
+        self.free_space_cache = {}  # root -> [checked at, free bytes]
+        self.root_devices = {}
+        
+        # Open handles for output roots and category folders, created once per session
+        self.root_fds = {}
+        self.category_dirs = {}
+        self.dir_lock = threading.Lock()
+        # Handles dropped from the cache stay open until no job can be using them
+        self.active_jobs = 0
+        self.retired_fds = []
+        self.counter_lock = threading.Lock()
+        self.name_lock = threading.Lock()
+        self.reserved_names = set()
+        
+        # Content-based type detection for extensionless or unknown files
+        self.sniffer = ContentSniffer()
+        
+        # Lists archive members for the catalog without extracting
+        self.archive_inspector = ArchiveInspector()
+        
+        # In-memory BK-tree over stored image hashes, built on first use
+        self.image_index = None
+        self.image_index_lock = threading.Lock()
+        
+        # Initialize counters
+        self.files_processed = 0
+        self.total_size_processed = 0
+        
+        if root is None:
+            return
+        
         # Create main notebook for tabs
         self.notebook = ttk.Notebook(root)
         self.notebook.pack(expand=True, fill="both", padx=5, pady=5)
@@ -54,12 +963,10 @@ class FileOrganizerApp:
         self.create_organizer_tab()
         self.create_extension_analyzer_tab()
         self.create_size_analyzer_tab()
+        self.create_similar_images_tab()
+        self.create_stats_tab()
         self.create_settings_tab()
         
-        # Initialize counters
-        self.files_processed = 0
-        self.total_size_processed = 0
-        
         # Create status bar with terminal styling
         self.status_bar = ttk.Label(
             root, 
@@ -70,12 +977,25 @@ class FileOrganizerApp:
             foreground="#999999"  # Light gray text
         )
         self.status_bar.pack(fill="x", side="bottom", pady=(0, 3))  # Reduced from 5 to 3
+        self.status_message = "ready"
+        self.status_lock = threading.Lock()
+        self.status_log = deque(maxlen=self.DEBUG_LOG_LINES)  # Messages not yet drawn
+        self.status_drawn = 0.0
+        self.refresh_status_bar()
+        for warning in self.output_root_warnings:
+            self.update_status(warning)
+        
+        # Pick up drops interrupted by a crash or quit
+        self.root.after(500, self.resume_jobs)
 
     def init_database(self):
         """Initialize SQLite database for file tracking"""
         db_path = Path.home() / ".file_organizer.db"
-        self.conn = sqlite3.connect(str(db_path))
+        # Shared with worker threads, serialized through db_lock
+        self.conn = sqlite3.connect(str(db_path), check_same_thread=False)
         self.cursor = self.conn.cursor()
+        self.db_lock = threading.Lock()
+        self.cursor.execute("PRAGMA journal_mode=WAL")
         
         # Create tables if they don't exist
         self.cursor.execute("""
@@ -92,13 +1012,514 @@ class FileOrganizerApp:
                 metadata TEXT
             )
         """)
+        
+        # Drops are persisted as jobs so they can be resumed after a crash
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS jobs (
+                id INTEGER PRIMARY KEY,
+                created TIMESTAMP,
+                status TEXT,
+                total INTEGER
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS job_items (
+                id INTEGER PRIMARY KEY,
+                job_id INTEGER,
+                path TEXT,
+                state TEXT,
+                new_path TEXT,
+                error TEXT
+            )
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_job_items_job_state
+            ON job_items (job_id, state, id)
+        """)
+        
+        # Perceptual hashes for near-duplicate image lookup
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS image_hashes (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                dhash INTEGER
+            )
+        """)
+        
+        # Archive member listings, so searches can cover archive contents
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archives (
+                path TEXT PRIMARY KEY,
+                size INTEGER,
+                mtime_ns INTEGER,
+                member_count INTEGER
+            )
+        """)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS archive_members (
+                id INTEGER PRIMARY KEY,
+                archive_path TEXT,
+                name TEXT,
+                extension TEXT,
+                size INTEGER,
+                compressed_size INTEGER
+            )
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_archive_members_archive
+            ON archive_members (archive_path)
+        """)
+        self.cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_archive_members_name
+            ON archive_members (name)
+        """)
+        
+        # Write-ahead journal for cross-device moves (copy, then delete source)
+        self.cursor.execute("""
+            CREATE TABLE IF NOT EXISTS move_journal (
+                id INTEGER PRIMARY KEY,
+                item_id INTEGER,
+                src TEXT,
+                dest TEXT,
+                state TEXT
+            )
+        """)
         self.conn.commit()
 
+    def create_job(self, paths):
+        """Persist a drop as a job with one pending item per path"""
+        with self.db_lock:
+            self.cursor.execute(
+                "INSERT INTO jobs (created, status, total) VALUES (?, 'running', ?)",
+                (datetime.now(), len(paths))
+            )
+            job_id = self.cursor.lastrowid
+            self.cursor.executemany(
+                "INSERT INTO job_items (job_id, path, state) VALUES (?, ?, 'pending')",
+                ((job_id, str(path)) for path in paths)
+            )
+            self.conn.commit()
+        return job_id
+
+    def checkpoint_job(self, updates):
+        """Write a batch of (state, new_path, error, item_id) updates in one transaction"""
+        if not updates:
+            return
+        with self.db_lock:
+            self.cursor.executemany(
+                "UPDATE job_items SET state = ?, new_path = ?, error = ? WHERE id = ?",
+                updates
+            )
+            self.conn.commit()
+
+    def run_job(self, job_id):
+        """Process the remaining pending items of a job, checkpointing in batches"""
+        with self.dir_handles_in_use():
+            self.validate_dir_handles()
+            with self.db_lock:
+                total, done = self.cursor.execute(
+                    "SELECT COUNT(*), COUNT(*) - SUM(state = 'pending') FROM job_items WHERE job_id = ?",
+                    (job_id,)
+                ).fetchone()
+            done = done or 0
+            self.update_status(f"Found {total - done} valid items to process")
+            self.stats.incr("drops")
+            
+            updates = []
+            updates_lock = threading.Lock()
+            progress = {'done': done}
+            
+            def record(update):
+                with updates_lock:
+                    updates.append(update)
+                    progress['done'] += 1
+                    self.progress['value'] = (progress['done'] / total) * 100
+            
+            def process(root, item_id, item_path, plan):
+                try:
+                    self.update_status(f"Processing {progress['done'] + 1}/{total}: {item_path}")
+                    if item_path.is_dir():
+                        new_path = self.organize_folder(item_path, item_id, root, plan)
+                    else:
+                        new_path = self.organize_file(item_path, item_id, root=root, plan=plan)
+                    if new_path:
+                        record(('moved', str(new_path), None, item_id))
+                    else:
+                        record(('failed', None, 'not moved', item_id))
+                except Exception as e:
+                    record(('failed', None, str(e), item_id))
+                    self.update_status(f"Error processing {item_path}: {str(e)}")
+            
+            def checkpoint():
+                with updates_lock:
+                    batch = updates[:]
+                    updates.clear()
+                with self.stats.stage("checkpoint"):
+                    self.checkpoint_job(batch)
+            
+            # One queue per output volume; items are placed before they are queued
+            volumes = VolumeQueues(self.output_roots, process, on_start=self.io.enter_background,
+                                   stats=self.stats, on_error=self.update_status)
+            last_checkpoint = time.monotonic()
+            last_id = 0
+            try:
+                while True:
+                    # Page through pending items so huge jobs are never fully in memory
+                    with self.db_lock:
+                        rows = self.cursor.execute(
+                            "SELECT id, path, new_path FROM job_items WHERE job_id = ? AND state = 'pending' AND id > ? "
+                            "ORDER BY id LIMIT ?",
+                            (job_id, last_id, self.JOB_PAGE_SIZE)
+                        ).fetchall()
+                    if not rows:
+                        break
+                    
+                    # Place and name the whole page, then record the planned
+                    # destinations in one transaction before anything moves
+                    planned_paths = []
+                    queued = []
+                    for item_id, path, planned in rows:
+                        last_id = item_id
+                        item_path = Path(path)
+                        if not item_path.exists() and not item_path.is_symlink():
+                            if planned and (os.path.exists(planned) or os.path.islink(planned)):
+                                # Moved after the last checkpoint
+                                record(('moved', planned, None, item_id))
+                            else:
+                                self.update_status(f"File not found: {item_path}")
+                                record(('failed', None, 'source no longer exists', item_id))
+                            continue
+                        try:
+                            root, plan = self.plan_item(item_path)
+                        except OSError as e:
+                            record(('failed', None, str(e), item_id))
+                            continue
+                        if plan is not None:
+                            category, dest_dir, dir_fd, name = plan
+                            planned_paths.append((str(dest_dir / name), item_id))
+                        queued.append((root, item_id, item_path, plan))
+                    if planned_paths:
+                        with self.db_lock:
+                            self.cursor.executemany(
+                                "UPDATE job_items SET new_path = ? WHERE id = ?", planned_paths
+                            )
+                            self.conn.commit()
+                    
+                    for root, item_id, item_path, plan in queued:
+                        volumes.submit(root, item_id, item_path, plan)
+                        if (len(updates) >= self.JOB_CHECKPOINT_SIZE
+                                or time.monotonic() - last_checkpoint >= self.JOB_CHECKPOINT_INTERVAL):
+                            checkpoint()
+                            last_checkpoint = time.monotonic()
+            finally:
+                volumes.close()
+            
+            checkpoint()
+            with self.db_lock:
+                self.cursor.execute("UPDATE jobs SET status = 'done' WHERE id = ?", (job_id,))
+                self.conn.commit()
+
+    def resume_jobs(self):
+        """Recover half-finished moves and resume unfinished jobs in the background"""
+        # Read state before any new drop can add to it; the file work runs off the UI thread
+        with self.db_lock:
+            entries = self.cursor.execute(
+                "SELECT id, item_id, src, dest, state FROM move_journal"
+            ).fetchall()
+            job_ids = [row[0] for row in self.cursor.execute(
+                "SELECT id FROM jobs WHERE status = 'running' ORDER BY id"
+            )]
+        if not entries and not job_ids:
+            return
+        
+        def process_jobs():
+            self.io.enter_background()
+            self.recover_move_journal(entries)
+            if not job_ids:
+                return
+            for job_id in job_ids:
+                self.update_status(f"Resuming interrupted job {job_id}")
+                self.run_job(job_id)
+            self.progress['value'] = 0
+            self.update_status("Processing complete")
+        
+        threading.Thread(target=process_jobs, daemon=True).start()
+
+    def journal_move(self, item_id, src, dest, state, journal_id=None):
+        """Record a cross-device move step durably before acting on it"""
+        with self.db_lock:
+            if journal_id is None:
+                self.cursor.execute(
+                    "INSERT INTO move_journal (item_id, src, dest, state) VALUES (?, ?, ?, ?)",
+                    (item_id, str(src), str(dest), state)
+                )
+                journal_id = self.cursor.lastrowid
+            elif state is None:
+                self.cursor.execute("DELETE FROM move_journal WHERE id = ?", (journal_id,))
+            else:
+                self.cursor.execute("UPDATE move_journal SET state = ? WHERE id = ?", (state, journal_id))
+            self.conn.commit()
+        return journal_id
+
+    def recover_move_journal(self, entries):
+        """Roll back or finish cross-device moves interrupted by a crash"""
+        for journal_id, item_id, src, dest, state in entries:
+            src, dest = Path(src), Path(dest)
+            try:
+                if state == 'copying':
+                    # Copy never completed, source is intact: discard the partial copy
+                    if src.exists() and (dest.exists() or dest.is_symlink()):
+                        self.remove_path(dest)
+                    self.update_status(f"Rolled back interrupted move of {src.name}")
+                elif state == 'copied':
+                    # Copy completed: finish removing the source
+                    if src.exists() or src.is_symlink():
+                        self.remove_path(src)
+                    if item_id is not None:
+                        self.checkpoint_job([('moved', str(dest), None, item_id)])
+                    self.update_status(f"Completed interrupted move of {src.name}")
+                self.journal_move(item_id, src, dest, None, journal_id)
+            except Exception as e:
+                self.update_status(f"❌ Error recovering move of {src}: {str(e)}")
+
+    def index_archive(self, path, allow_streaming=True):
+        """
+        Return [(name, extension, size), ...] for an archive's members,
+        storing the listing in the catalog. Unchanged archives are read from
+        the catalog; unsupported or unreadable archives return None.
+        """
+        path = str(path)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        with self.db_lock:
+            row = self.cursor.execute(
+                "SELECT size, mtime_ns FROM archives WHERE path = ?", (path,)
+            ).fetchone()
+            if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                return self.cursor.execute(
+                    "SELECT name, extension, size FROM archive_members WHERE archive_path = ?", (path,)
+                ).fetchall()
+        
+        with self.stats.stage("archive"):
+            members = self.archive_inspector.members(path, allow_streaming)
+        if members is None:
+            return None
+        listing = [(name, os.path.splitext(name)[1].lower(), size, compressed_size)
+                   for name, size, compressed_size in members]
+        with self.db_lock:
+            self.cursor.execute("DELETE FROM archive_members WHERE archive_path = ?", (path,))
+            self.cursor.execute(
+                "INSERT OR REPLACE INTO archives (path, size, mtime_ns, member_count) VALUES (?, ?, ?, ?)",
+                (path, st.st_size, st.st_mtime_ns, len(listing))
+            )
+            self.cursor.executemany(
+                "INSERT INTO archive_members (archive_path, name, extension, size, compressed_size) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((path,) + member for member in listing)
+            )
+            self.conn.commit()
+        return [(name, ext, size) for name, ext, size, compressed_size in listing]
+
+    def rename_archive(self, old_path, new_path):
+        """Point an archive's catalog entries at its new location after a move"""
+        with self.db_lock:
+            self.cursor.execute("DELETE FROM archive_members WHERE archive_path = ?", (str(new_path),))
+            self.cursor.execute("DELETE FROM archives WHERE path = ?", (str(new_path),))
+            self.cursor.execute("UPDATE archives SET path = ? WHERE path = ?", (str(new_path), str(old_path)))
+            self.cursor.execute(
+                "UPDATE archive_members SET archive_path = ? WHERE archive_path = ?",
+                (str(new_path), str(old_path))
+            )
+            self.conn.commit()
+
+    def remove_path(self, path):
+        """Delete a file, symlink or directory tree"""
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        else:
+            path.unlink()
+
+    def move_path(self, src, dest, item_id=None, dest_dir_fd=None):
+        """
+        Move src to dest. Same-device moves are a single atomic rename;
+        cross-device moves are journaled so a crash midway can be recovered.
+        With dest_dir_fd the rename is done relative to the open folder handle.
+        """
+        # Device lookups are only needed for budgets
+        devices = (self.io.device(src), self.io.device(dest)) if self.io.enabled else ()
+        try:
+            with self.io.operation(devices):
+                if dest_dir_fd is None:
+                    os.rename(src, dest)
+                else:
+                    os.rename(src, dest.name, dst_dir_fd=dest_dir_fd)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+        
+        journal_id = self.journal_move(item_id, src, dest, 'copying')
+        if src.is_dir() and not src.is_symlink():
+            shutil.copytree(src, dest, symlinks=True, copy_function=self.io.copy_file)
+        else:
+            self.io.copy_file(src, dest)
+        self.journal_move(item_id, src, dest, 'copied', journal_id)
+        self.remove_path(src)
+        self.journal_move(item_id, src, dest, None, journal_id)
+
+    def category_dir(self, category, subcategory=None, root=None):
+        """
+        Return (path, dir_fd) for a category folder or a subfolder of it on
+        an output root (base_dir by default), creating it at most once per
+        session. dir_fd is None where directory handles are unsupported, and
+        for subfolders, whose number grows with every dropped folder.
+        """
+        root = root or self.base_dir
+        key = (root, category, subcategory)
+        entry = self.category_dirs.get(key)
+        if entry is not None:
+            return entry
+        if subcategory is None:
+            parent_dir, parent_fd = root, None
+            name = category
+        else:
+            parent_dir, parent_fd = self.category_dir(category, root=root)
+            name = subcategory
+        with self.dir_lock:
+            entry = self.category_dirs.get(key)
+            if entry is not None:
+                return entry
+            dest_dir = parent_dir / name
+            with self.stats.stage("mkdir"):
+                if self.DIR_FD_SUPPORTED:
+                    if parent_fd is None:
+                        parent_fd = self.root_fds.get(root)
+                        if parent_fd is None:
+                            parent_fd = self.root_fds[root] = os.open(root, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.mkdir(name, dir_fd=parent_fd)
+                    except FileExistsError:
+                        pass
+                    if subcategory is None:
+                        dir_fd = os.open(name, os.O_RDONLY | os.O_DIRECTORY, dir_fd=parent_fd)
+                    else:
+                        dir_fd = None
+                else:
+                    dest_dir.mkdir(parents=True, exist_ok=True)
+                    dir_fd = None
+            entry = self.category_dirs[key] = (dest_dir, dir_fd)
+        return entry
+
+    def name_exists(self, dest_dir, dir_fd, name):
+        """Check for an entry in a category folder without building a new path"""
+        try:
+            if dir_fd is None:
+                os.lstat(os.path.join(dest_dir, name))
+            else:
+                os.lstat(name, dir_fd=dir_fd)
+        except FileNotFoundError:
+            return False
+        return True
+
+    def reserve_name(self, dest_dir, dir_fd, candidates):
+        """
+        Claim the first free name from candidates until release_name is
+        called, so parallel moves into one folder never pick the same name.
+        """
+        with self.name_lock:
+            for name in candidates:
+                key = (dest_dir, name)
+                if key not in self.reserved_names and not self.name_exists(dest_dir, dir_fd, name):
+                    self.reserved_names.add(key)
+                    return name
+
+    def release_name(self, dest_dir, name):
+        """Release a name claimed with reserve_name"""
+        with self.name_lock:
+            self.reserved_names.discard((dest_dir, name))
+
+    def close_dir_handles(self):
+        """
+        Drop cached folder handles so they are reopened on next use. While a
+        job is running they are only retired, since its workers may still be
+        renaming through them.
+        """
+        with self.dir_lock:
+            self.retired_fds.extend(dir_fd for dest_dir, dir_fd in self.category_dirs.values()
+                                    if dir_fd is not None)
+            self.retired_fds.extend(self.root_fds.values())
+            self.root_fds = {}
+            self.category_dirs = {}
+            if self.active_jobs:
+                return
+            retired, self.retired_fds = self.retired_fds, []
+        for dir_fd in retired:
+            os.close(dir_fd)
+
+    @contextlib.contextmanager
+    def dir_handles_in_use(self):
+        """Keep retired folder handles open until the enclosed job finishes"""
+        with self.dir_lock:
+            self.active_jobs += 1
+        try:
+            yield
+        finally:
+            with self.dir_lock:
+                self.active_jobs -= 1
+                retired = []
+                if not self.active_jobs:
+                    retired, self.retired_fds = self.retired_fds, []
+            for dir_fd in retired:
+                os.close(dir_fd)
+
+    def validate_dir_handles(self):
+        """Drop cached handles if any folder was removed or replaced since it was opened"""
+        with self.dir_lock:
+            # Folders cached without a handle only need to still exist
+            missing = [key for key, (path, dir_fd) in self.category_dirs.items()
+                       if dir_fd is None and not os.path.isdir(path)]
+            for key in missing:
+                del self.category_dirs[key]
+            handles = list(self.root_fds.items()) + list(self.category_dirs.values())
+        for path, dir_fd in handles:
+            if dir_fd is None:
+                continue
+            try:
+                opened = os.fstat(dir_fd)
+                current = os.stat(path)
+                if (opened.st_dev, opened.st_ino) == (current.st_dev, current.st_ino):
+                    continue
+            except OSError:
+                pass
+            self.close_dir_handles()
+            return
+
     def load_config(self):
         """Load or create configuration file"""
         default_config = {
             "base_dir": str(Path.home() / "OrganizedFiles"),
             "duplicate_handling": "rename",
+            "instrumentation": False,
+            "sniff_content": True,
+            "recursive_folders": False,
+            "folder_subcategory": False,
+            "max_parallel_moves": 4,
+            "near_duplicate_distance": 6,
+            "index_archives": True,
+            "output_roots": [],
+            "placement": {"default": "round_robin"},
+            "free_space_ttl": 30,
+            "analysis_export": {"format": "off", "dir": str(Path.home())},
+            "io_limits": {
+                "bytes_per_sec": 0,
+                "ops_per_sec": 0,
+                "per_device": {},
+                "idle_priority": False,
+                "adaptive": False
+            },
             "categories": {
                 "Applications": [".app", ".vst3", ".dmg"],
                 "Logic Projects": [".logicx"],
@@ -140,6 +1561,159 @@ class FileOrganizerApp:
         # Ensure base directory exists
         self.base_dir = Path(self.config["base_dir"])
         self.base_dir.mkdir(exist_ok=True)
+        self.load_output_roots()
+
+    def load_output_roots(self):
+        """
+        Set up the output roots; base_dir is always the first of them.
+        Roots that are missing, or that share a volume with an earlier root
+        (usually an unmounted mount point), are skipped with a warning in
+        output_root_warnings rather than created on the wrong disk.
+        """
+        self.output_roots = [self.base_dir]
+        self.output_root_warnings = []
+        devices = {os.stat(self.base_dir).st_dev}
+        for root in self.config.get("output_roots", []):
+            root = Path(root)
+            if root in self.output_roots:
+                continue
+            try:
+                dev = os.stat(root).st_dev
+            except OSError:
+                self.output_root_warnings.append(f"⚠️ Skipping output root {root}: not found (volume not mounted?)")
+                continue
+            if dev in devices:
+                self.output_root_warnings.append(
+                    f"⚠️ Skipping output root {root}: on the same volume as another root (volume not mounted?)"
+                )
+                continue
+            devices.add(dev)
+            self.output_roots.append(root)
+
+    def free_space(self, root):
+        """Free bytes on a root's volume, cached for free_space_ttl seconds"""
+        cached = self.free_space_cache.get(root)
+        now = time.monotonic()
+        if cached is None or now - cached[0] > self.config.get("free_space_ttl", 30):
+            try:
+                try:
+                    st = os.statvfs(root)
+                    free = st.f_bavail * st.f_frsize
+                except AttributeError:  # No statvfs on Windows
+                    free = shutil.disk_usage(root).free
+            except OSError as e:
+                self.drop_output_root(root, e)
+                return -1
+            cached = self.free_space_cache[root] = [now, free]
+        return cached[1]
+
+    def root_device(self, root):
+        """Device id of an output root"""
+        dev = self.root_devices.get(root)
+        if dev is None:
+            try:
+                dev = self.root_devices[root] = os.stat(root).st_dev
+            except OSError as e:
+                self.drop_output_root(root, e)
+                return -1
+        return dev
+
+    def drop_output_root(self, root, error):
+        """
+        Stop placing items on an output root that became unreachable, e.g.
+        an unmounted volume. base_dir is kept; its moves fail individually.
+        """
+        if root == self.base_dir or root not in self.output_roots:
+            return
+        # Replace rather than mutate, since placement may be iterating the old list
+        self.output_roots = [other for other in self.output_roots if other != root]
+        self.free_space_cache.pop(root, None)
+        self.root_devices.pop(root, None)
+        self.update_status(f"⚠️ Skipping output root {root}: {error} (volume not mounted?)")
+
+    def choose_root(self, category, src_path, size=0):
+        """
+        Pick the output root for an item using the category's placement
+        policy: round_robin, most_free or same_device.
+        """
+        roots = self.output_roots
+        if len(roots) == 1:
+            return roots[0]
+        placement = self.config.get("placement", {})
+        policy = placement.get(category, placement.get("default", "round_robin"))
+        
+        if policy == "same_device":
+            # A move to the source's own volume stays a rename
+            dev = self.io.device(src_path)
+            for root in roots:
+                if self.root_device(root) == dev:
+                    return root
+            policy = "most_free"
+        
+        with self.placement_lock:
+            if policy == "most_free":
+                root = max(roots, key=self.free_space)
+                if root in self.free_space_cache:
+                    # Account for the pending write until the next refresh
+                    self.free_space_cache[root][1] -= size
+                return root
+            index = self.round_robin.get(category, 0)
+            self.round_robin[category] = index + 1
+            # Roots dropped while placing are no longer candidates
+            roots = self.output_roots
+        return roots[index % len(roots)]
+
+    def plan_item(self, path):
+        """
+        Place a dropped item before it is queued. Returns (root, plan) where
+        plan is (category, dest_dir, dir_fd, name) with the name reserved,
+        or None for folders whose contents are organized file by file.
+        """
+        st = os.stat(path)
+        if stat.S_ISDIR(st.st_mode):
+            if self.config.get("recursive_folders", False):
+                return self.output_roots[0], None
+            category = "Folders"
+        else:
+            with self.stats.stage("categorize"):
+                category = self.get_category(path)
+        root = self.choose_root(category, path, st.st_size)
+        try:
+            return root, self.reserve_destination(path, category, root=root)
+        except OSError as e:
+            # Round-robin placement never stats roots, so a vanished volume shows up here
+            if root == self.base_dir or os.path.isdir(root):
+                raise
+            self.drop_output_root(root, e)
+            root = self.choose_root(category, path, st.st_size)
+            return root, self.reserve_destination(path, category, root=root)
+
+    def reserve_destination(self, path, category, subcategory=None, root=None):
+        """
+        Pick and reserve a free name for path in its category folder.
+        Returns (category, dest_dir, dir_fd, name); release the name with
+        release_name once the move is done.
+        """
+        dest_dir, dir_fd = self.category_dir(category, subcategory, root)
+        name = path.name
+        
+        # Handle duplicates
+        def candidate_names():
+            yield name
+            counter = 1
+            while True:
+                if category == "Folders":
+                    yield f"{name}_{counter}"
+                else:
+                    stem = path.stem
+                    if stem.endswith(f"_{counter-1}"):
+                        stem = stem.rsplit('_', 1)[0]
+                    yield f"{stem}_{counter}{path.suffix}"
+                counter += 1
+        
+        with self.stats.stage("dedupe"):
+            name = self.reserve_name(dest_dir, dir_fd, candidate_names())
+        return category, dest_dir, dir_fd, name
 
     def save_config(self):
         """Save current configuration to file"""
@@ -296,6 +1870,85 @@ class FileOrganizerApp:
             value="replace"
         ).pack(side='left', padx=5)
         
+        # Instrumentation toggle
+        stats_frame = ttk.Frame(settings_frame)
+        stats_frame.pack(fill='x', padx=10, pady=5)
+        
+        self.instrumentation_var = tk.BooleanVar(value=self.config.get("instrumentation", False))
+        ttk.Checkbutton(
+            stats_frame,
+            text="Collect pipeline timing stats",
+            variable=self.instrumentation_var
+        ).pack(side='left', padx=5)
+        
+        # Recursive folder mode
+        folders_frame = ttk.Frame(settings_frame)
+        folders_frame.pack(fill='x', padx=10, pady=5)
+        
+        self.recursive_var = tk.BooleanVar(value=self.config.get("recursive_folders", False))
+        ttk.Checkbutton(
+            folders_frame,
+            text="Organize folder contents",
+            variable=self.recursive_var
+        ).pack(side='left', padx=5)
+        
+        self.subcategory_var = tk.BooleanVar(value=self.config.get("folder_subcategory", False))
+        ttk.Checkbutton(
+            folders_frame,
+            text="Keep folder name as subfolder",
+            variable=self.subcategory_var
+        ).pack(side='left', padx=5)
+        
+        # Analyzer export
+        export = self.config.get("analysis_export", {})
+        export_frame = ttk.Frame(settings_frame)
+        export_frame.pack(fill='x', padx=10, pady=5)
+        
+        ttk.Label(export_frame, text="Export analysis:").pack(side='left', padx=5)
+        self.export_format_var = tk.StringVar(value=export.get("format", "off"))
+        ttk.Combobox(
+            export_frame,
+            textvariable=self.export_format_var,
+            values=["off", "jsonl", "csv", "sqlite"],
+            state='readonly',
+            width=7
+        ).pack(side='left', padx=5)
+        self.export_dir_entry = ttk.Entry(export_frame)
+        self.export_dir_entry.insert(0, export.get("dir", str(Path.home())))
+        self.export_dir_entry.pack(side='left', fill='x', expand=True, padx=5)
+        
+        # I/O budgets
+        io_limits = self.config.get("io_limits", {})
+        io_frame = ttk.Frame(settings_frame)
+        io_frame.pack(fill='x', padx=10, pady=5)
+        
+        ttk.Label(io_frame, text="I/O limit (MB/s, 0 = off):").pack(side='left', padx=5)
+        self.io_bytes_entry = ttk.Entry(io_frame, width=6)
+        self.io_bytes_entry.insert(0, f"{io_limits.get('bytes_per_sec', 0) / (1024 * 1024):g}")
+        self.io_bytes_entry.pack(side='left', padx=5)
+        
+        ttk.Label(io_frame, text="ops/s:").pack(side='left', padx=5)
+        self.io_ops_entry = ttk.Entry(io_frame, width=6)
+        self.io_ops_entry.insert(0, str(io_limits.get('ops_per_sec', 0)))
+        self.io_ops_entry.pack(side='left', padx=5)
+        
+        io_options_frame = ttk.Frame(settings_frame)
+        io_options_frame.pack(fill='x', padx=10, pady=5)
+        
+        self.io_idle_var = tk.BooleanVar(value=io_limits.get("idle_priority", False))
+        ttk.Checkbutton(
+            io_options_frame,
+            text="Idle I/O priority",
+            variable=self.io_idle_var
+        ).pack(side='left', padx=5)
+        
+        self.io_adaptive_var = tk.BooleanVar(value=io_limits.get("adaptive", False))
+        ttk.Checkbutton(
+            io_options_frame,
+            text="Back off when disks are slow",
+            variable=self.io_adaptive_var
+        ).pack(side='left', padx=5)
+        
         # Save button
         ttk.Button(
             settings_frame,
@@ -475,6 +2128,137 @@ class FileOrganizerApp:
         self.size_drop_frame.dnd_bind('<<DragEnter>>', on_size_enter)
         self.size_drop_frame.dnd_bind('<<DragLeave>>', on_size_leave)
 
+    def create_similar_images_tab(self):
+        """Create tab for finding near-duplicate images"""
+        similar_frame = ttk.Frame(self.notebook)
+        self.notebook.add(similar_frame, text="Similar Images")
+        
+        # Add text area for results with dark theme
+        self.similar_text = ScrolledText(
+            similar_frame, 
+            height=20,
+            padx=8,
+            pady=8,
+            wrap='word',
+            borderwidth=0,
+            highlightthickness=0,
+            bg='#1e1e1e',
+            fg='#999999',
+            state='disabled',  # Make read-only
+            cursor=''  # Hide cursor
+        )
+        
+        # Configure scrollbar for darker theme
+        self.similar_text.vbar.configure(
+            width=8,
+            borderwidth=0,
+            elementborderwidth=0,
+            troughcolor="#1e1e1e",
+            background="#2d2d2d",
+            activebackground="#3d3d3d"
+        )
+        
+        # Add auto-hide scrollbar
+        def hide_similar_scrollbar(*args):
+            if self.similar_text.yview() == (0.0, 1.0):
+                self.similar_text.vbar.pack_forget()
+            else:
+                self.similar_text.vbar.pack(side='right', fill='y')
+        
+        self.similar_text.vbar.pack_forget()  # Initially hide scrollbar
+        self.similar_text.bind('<<Modified>>', hide_similar_scrollbar)
+        self.similar_text.pack(fill='both', expand=True, padx=20, pady=5)
+        
+        # Drop zone with dark theme
+        self.similar_drop_frame = ttk.Frame(similar_frame)
+        self.similar_drop_frame.pack(pady=10, padx=20, fill='x')
+        
+        # Create inner frame for visual feedback
+        self.inner_similar_frame = tk.Frame(
+            self.similar_drop_frame,
+            bg='#2b2b2b',
+            highlightthickness=2,
+            highlightbackground='#333333'
+        )
+        self.inner_similar_frame.pack(expand=True, fill="both", padx=1, pady=1)
+        
+        # Instructions with matching theme
+        similar_label = tk.Label(
+            self.inner_similar_frame,
+            text="Drag images or folders here to find near-duplicates",
+            font=('Arial', 12),
+            fg='#999999',
+            bg='#2b2b2b'
+        )
+        similar_label.pack(expand=True, pady=20)
+        
+        # Configure drop zone
+        self.similar_drop_frame.drop_target_register(DND_FILES)
+        self.similar_drop_frame.dnd_bind('<<Drop>>', self.find_similar_images)
+        
+        # Add drag-over effect
+        def on_similar_enter(event):
+            self.inner_similar_frame.config(
+                highlightbackground='#2196F3',
+                bg='#1565C0'
+            )
+            similar_label.config(bg='#1565C0', fg='white')
+        
+        def on_similar_leave(event):
+            self.inner_similar_frame.config(
+                highlightbackground='#333333',
+                bg='#2b2b2b'
+            )
+            similar_label.config(bg='#2b2b2b', fg='#999999')
+        
+        self.similar_drop_frame.dnd_bind('<<DragEnter>>', on_similar_enter)
+        self.similar_drop_frame.dnd_bind('<<DragLeave>>', on_similar_leave)
+
+    def create_stats_tab(self):
+        """Create tab showing live per-stage pipeline timings"""
+        self.stats_frame = ttk.Frame(self.notebook)
+        self.notebook.add(self.stats_frame, text="Stats")
+        
+        # Add text area for results with dark theme
+        self.stats_text = ScrolledText(
+            self.stats_frame, 
+            height=20,
+            padx=8,
+            pady=8,
+            wrap='none',
+            borderwidth=0,
+            highlightthickness=0,
+            bg='#1e1e1e',
+            fg='#999999',
+            font=('Menlo', 11),
+            state='disabled',  # Make read-only
+            cursor=''  # Hide cursor
+        )
+        
+        # Configure scrollbar for darker theme
+        self.stats_text.vbar.configure(
+            width=8,
+            borderwidth=0,
+            elementborderwidth=0,
+            troughcolor="#1e1e1e",
+            background="#2d2d2d",
+            activebackground="#3d3d3d"
+        )
+        self.stats_text.pack(fill='both', expand=True, padx=20, pady=5)
+        
+        self.refresh_stats_tab()
+
+    def refresh_stats_tab(self):
+        """Redraw the Stats tab and reschedule while the app is running"""
+        # Only redraw when the tab is visible to keep idle cost low
+        if self.notebook.select() == str(self.stats_frame):
+            report = self.stats.format_report()
+            self.stats_text.config(state='normal')
+            self.stats_text.delete(1.0, tk.END)
+            self.stats_text.insert(tk.END, report)
+            self.stats_text.config(state='disabled')
+        self.root.after(1000, self.refresh_stats_tab)
+
     def extract_metadata(self, file_path):
         """Extract metadata from various file types"""
         metadata = {}
@@ -507,84 +2291,130 @@ class FileOrganizerApp:
         """Calculate SHA-256 hash of file"""
         hasher = hashlib.sha256()
         with open(file_path, 'rb') as f:
-            for chunk in iter(lambda: f.read(4096), b''):
+            for chunk in self.io.read_chunks(f, file_path, 4096):
                 hasher.update(chunk)
         return hasher.hexdigest()
 
-    def organize_file(self, file_path):
+    def get_category(self, file_path):
+        """Return the category name a file or bundle should be organized into"""
+        # Handle bundles (.app, .logicx, .vst3)
+        if file_path.is_dir() and file_path.suffix.lower() in ['.app', '.logicx', '.vst3']:
+            if file_path.suffix.lower() == '.logicx':
+                category = "Logic Projects"
+            elif file_path.suffix.lower() in ['.app', '.vst3']:
+                category = "Applications"
+        else:
+            # Get category by extension
+            extension = file_path.suffix.lower()
+            category = None
+            
+            # Check if file is a screenshot
+            screenshot_patterns = ['screen shot', 'screenshot', 'screen-shot', 'screen_shot']
+            is_screenshot = extension in ['.png', '.jpg', '.jpeg'] and any(pattern in file_path.name.lower() for pattern in screenshot_patterns)
+            
+            if is_screenshot:
+                category = "Screenshots"
+            # Special cases
+            elif extension == '.dmg':
+                category = "Applications"
+            elif extension in ['.webp', '.svg']:
+                category = "Images"
+            else:
+                # Check all categories
+                category = self.category_for_extension(extension)
+                
+                # Missing extension: look at the file contents. Unknown extensions
+                # are left alone, since a generic container match can mislead
+                if category is None and not extension and self.config.get("sniff_content", True):
+                    with self.stats.stage("sniff"):
+                        detected = self.sniffer.sniff(file_path)
+                    if detected:
+                        category = self.category_for_extension(detected)
+                        if category:
+                            self.update_status(f"Detected {file_path.name} as {detected} from its contents")
+            
+            # If no category found, use Others
+            if category is None:
+                category = "Others"
+        
+        return category
+
+    def category_for_extension(self, extension):
+        """Return the first configured category listing an extension, or None"""
+        for cat, exts in self.config["categories"].items():
+            if extension in exts:
+                return cat
+        return None
+
+    def organize_file(self, file_path, item_id=None, subcategory=None, root=None, plan=None):
         """
-        Move a single file to its category folder based on extension.
+        Move a single file to its category folder based on extension,
+        optionally into a subcategory folder below it. The output root is
+        chosen by the category's placement policy unless given. A plan from
+        reserve_destination skips categorizing and naming, and its reserved
+        name is released either way.
         Handles path normalization and duplicate files.
+        Returns the destination path, or None if the file was not moved.
         """
         try:
-            file_path = Path(str(file_path)).resolve()
-            if not file_path.exists():
+            with self.stats.stage("resolve"):
+                # Dropped and job paths are already absolute; only resolve relative ones
+                if not isinstance(file_path, Path):
+                    file_path = Path(file_path)
+                if not file_path.is_absolute():
+                    file_path = file_path.resolve()
+                try:
+                    size = os.stat(file_path).st_size
+                except OSError:
+                    size = None
+            if size is None:
                 self.update_status(f"Skipping: {file_path} (not found)")
-                return
+                return None
             
-            # Handle bundles (.app, .logicx, .vst3)
-            if file_path.is_dir() and file_path.suffix.lower() in ['.app', '.logicx', '.vst3']:
-                if file_path.suffix.lower() == '.logicx':
-                    category = "Logic Projects"
-                elif file_path.suffix.lower() in ['.app', '.vst3']:
-                    category = "Applications"
-            else:
-                # Get category by extension
-                extension = file_path.suffix.lower()
-                category = None
-                
-                # Check if file is a screenshot
-                screenshot_patterns = ['screen shot', 'screenshot', 'screen-shot', 'screen_shot']
-                is_screenshot = extension in ['.png', '.jpg', '.jpeg'] and any(pattern in file_path.name.lower() for pattern in screenshot_patterns)
-                
-                if is_screenshot:
-                    category = "Screenshots"
-                # Special cases
-                elif extension == '.dmg':
-                    category = "Applications"
-                elif extension in ['.webp', '.svg']:
-                    category = "Images"
-                else:
-                    # Check all categories
-                    for cat, exts in self.config["categories"].items():
-                        if extension in exts:
-                            category = cat
-                            break
-                
-                # If no category found, use Others
-                if category is None:
-                    category = "Others"
+            if plan is None:
+                with self.stats.stage("categorize"):
+                    category = self.get_category(file_path)
+                # Category folder is created and opened once, then reused
+                if root is None:
+                    root = self.choose_root(category, file_path, size)
+                plan = self.reserve_destination(file_path, category, subcategory, root)
+            category, dest_dir, dir_fd, name = plan
+            dest_path = dest_dir / name
             
             self.update_status(f"Categorizing {file_path.name} as {category}")
             
-            # Create destination path
-            dest_dir = self.base_dir / category
-            dest_dir.mkdir(parents=True, exist_ok=True)
-            dest_path = dest_dir / file_path.name
-            
-            # Handle duplicates
-            if dest_path.exists():
-                counter = 1
-                while dest_path.exists():
-                    stem = file_path.stem
-                    if stem.endswith(f"_{counter-1}"):
-                        stem = stem.rsplit('_', 1)[0]
-                    new_name = f"{stem}_{counter}{file_path.suffix}"
-                    dest_path = dest_dir / new_name
-                    counter += 1
-            
             try:
                 self.update_status(f"Moving {file_path.name} to {category}")
-                shutil.move(str(file_path), str(dest_path))
-                self.files_processed += 1
-                self.total_size_processed += dest_path.stat().st_size
-                self.update_stats_display()
+                with self.stats.stage("move"):
+                    self.move_path(file_path, dest_path, item_id, dir_fd)
+                with self.counter_lock:
+                    self.files_processed += 1
+                    self.total_size_processed += size
+                self.stats.incr("files_moved")
+                self.stats.incr("bytes_moved", size)
                 self.update_status(f"✓ Successfully moved to {category}")
             except Exception as e:
+                self.stats.incr("move_errors")
                 self.update_status(f"❌ Error moving file: {str(e)}")
+                return None
+            
+            # Catalog archive contents at their new location; compressed
+            # tars are left for the analyzers since listing them means decoding.
+            # The move already happened, so a bad listing must not change the result
+            if category == "Archives" and self.config.get("index_archives", True):
+                try:
+                    self.rename_archive(file_path, dest_path)
+                    self.index_archive(dest_path, allow_streaming=False)
+                except Exception as e:
+                    self.update_status(f"❌ Error indexing archive {dest_path.name}: {str(e)}")
+            return dest_path
             
         except Exception as e:
             self.update_status(f"❌ Error processing {file_path.name}: {str(e)}")
+        finally:
+            if plan is not None:
+                self.release_name(plan[1], plan[3])
+        return None
 
     def update_stats_display(self):
         """Update the statistics display"""
@@ -605,21 +2435,87 @@ class FileOrganizerApp:
         """Save current settings to config"""
         self.config["base_dir"] = self.dir_entry.get()
         self.config["duplicate_handling"] = self.dup_var.get()
+        self.config["instrumentation"] = self.instrumentation_var.get()
+        self.config["recursive_folders"] = self.recursive_var.get()
+        self.config["folder_subcategory"] = self.subcategory_var.get()
+        self.config["analysis_export"] = {
+            "format": self.export_format_var.get(),
+            "dir": self.export_dir_entry.get()
+        }
+        self.stats.enabled = self.config["instrumentation"]
+        
+        io_limits = self.config.setdefault("io_limits", {})
+        try:
+            io_limits["bytes_per_sec"] = int(float(self.io_bytes_entry.get() or 0) * 1024 * 1024)
+            io_limits["ops_per_sec"] = int(float(self.io_ops_entry.get() or 0))
+        except ValueError:
+            self.status_bar.config(text="Invalid I/O limit")
+            return
+        io_limits["idle_priority"] = self.io_idle_var.get()
+        io_limits["adaptive"] = self.io_adaptive_var.get()
+        self.io = IOScheduler(io_limits)
+        
         self.save_config()
         self.base_dir = Path(self.config["base_dir"])
         self.base_dir.mkdir(exist_ok=True)
+        self.close_dir_handles()
+        self.load_output_roots()
+        for warning in self.output_root_warnings:
+            self.update_status(warning)
         self.status_bar.config(text="Settings saved successfully")
 
     def update_status(self, message):
-        """Update status bar message and debug window"""
-        print(message)
-        self.status_bar.config(text=f"🐰 {message}")  # Add rabbit to all status messages
+        """
+        Update status bar message and debug window. Messages are buffered
+        and drawn by refresh_status_bar, so worker threads never wait on Tk;
+        the UI thread draws directly, at most every STATUS_INTERVAL.
+        """
+        with self.stats.stage("ui"):
+            print(message)
+            if self.root is None:
+                return
+            with self.status_lock:
+                self.status_message = message
+                self.status_log.append(message)
+            if (threading.current_thread() is threading.main_thread()
+                    and time.monotonic() - self.status_drawn >= self.STATUS_INTERVAL):
+                self.draw_status()
+                self.root.update_idletasks()
+
+    def draw_status(self):
+        """Append buffered messages to the debug log, trimmed to DEBUG_LOG_LINES"""
+        with self.status_lock:
+            lines = list(self.status_log)
+            self.status_log.clear()
+            message = self.status_message
+        self.status_drawn = time.monotonic()
+        self.status_bar.config(text=self.format_status(message))
+        if not lines:
+            return
         self.debug_text.config(state='normal')
-        self.debug_text.insert('end', f"{message}\n", "default")
+        self.debug_text.insert('end', "".join(f"{line}\n" for line in lines), "default")
+        line_count = int(self.debug_text.index('end-1c').split('.')[0])
+        if line_count > self.DEBUG_LOG_LINES:
+            self.debug_text.delete('1.0', f"{line_count - self.DEBUG_LOG_LINES}.0")
         self.debug_text.see('end')
         self.debug_text.config(state='disabled')
         self.debug_text.edit_modified(True)
-        self.root.update_idletasks()
+
+    def format_status(self, message):
+        """Format a status bar message, flagging throttled I/O"""
+        text = f"🐰 {message}"  # Add rabbit to all status messages
+        if self.io.is_throttled():
+            text += "  ⏳ throttled"
+        return text
+
+    def refresh_status_bar(self):
+        """
+        Draw buffered status messages and counters at a fixed rate, and keep
+        the throttling indicator current while workers are sleeping.
+        """
+        self.draw_status()
+        self.update_stats_display()
+        self.root.after(int(self.STATUS_INTERVAL * 1000), self.refresh_status_bar)
 
     def on_drop(self, event):
         """
@@ -650,9 +2546,11 @@ class FileOrganizerApp:
                     # Convert to Path object and resolve
                     if clean_path.startswith('file://'):
                         clean_path = clean_path[7:]
-                    file_path = Path(clean_path).expanduser().resolve()
+                    with self.stats.stage("resolve"):
+                        file_path = Path(clean_path).expanduser().resolve()
+                        exists = file_path.exists()
                     
-                    if file_path.exists():
+                    if exists:
                         items_to_process.append(file_path)
                         self.update_status(f"Added to process: {file_path}")
                     else:
@@ -669,29 +2567,54 @@ class FileOrganizerApp:
                 except Exception as e:
                     self.update_status(f"Error processing path {path}: {str(e)}")
             
-            # Process files
-            total_items = len(items_to_process)
-            self.update_status(f"Found {total_items} valid items to process")
-            
-            for i, item_path in enumerate(items_to_process, 1):
-                try:
-                    self.update_status(f"Processing {i}/{total_items}: {item_path}")
-                    if item_path.is_dir():
-                        self.organize_folder(item_path)
-                    else:
-                        self.organize_file(item_path)
-                    self.progress['value'] = (i / total_items) * 100
-                    
-                except Exception as e:
-                    self.update_status(f"Error processing {item_path}: {str(e)}")
-            
-            self.progress['value'] = 0
-            self.update_status("Processing complete")
+            # Persist the drop as a job, then process it; an unfinished job resumes on next start
+            job_id = self.create_job(items_to_process)
+            try:
+                self.run_job(job_id)
+                self.update_status("Processing complete")
+            except Exception as e:
+                self.update_status(f"❌ Error processing drop: {str(e)}")
+            finally:
+                self.progress['value'] = 0
+        
+        def run():
+            self.io.enter_background()
+            with self.stats.profiled():
+                process_files()
         
         # Run processing in background thread
-        thread = threading.Thread(target=process_files)
+        thread = threading.Thread(target=run)
         thread.start()
 
+    def open_export(self, table, fields):
+        """
+        Return an export sink for an analyzer run from the GUI, or a null
+        context when export is turned off in settings.
+        """
+        export = self.config.get("analysis_export", {})
+        suffix = {'jsonl': '.jsonl', 'csv': '.csv', 'sqlite': '.db'}.get(export.get("format"))
+        if suffix is None:
+            return contextlib.nullcontext()
+        timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        path = Path(export.get("dir") or Path.home()) / f"{table}-{timestamp}{suffix}"
+        return ExportSink(path, table, fields)
+
+    def top_level_paths(self, paths):
+        """
+        Resolve dropped paths, skipping missing ones and any path inside
+        another dropped folder, so no file is visited twice.
+        """
+        resolved = []
+        for path_str in paths:
+            try:
+                path = Path(path_str).resolve()
+                if path.exists() and path not in resolved:
+                    resolved.append(path)
+            except Exception as e:
+                self.update_status(f"Error processing {path_str}: {e}")
+        return [path for path in resolved
+                if not any(other in path.parents for other in resolved)]
+
     def analyze_extensions(self, event):
         """Analyze file extensions from dropped files"""
         raw_data = event.data
@@ -700,52 +2623,125 @@ class FileOrganizerApp:
         paths = raw_data.strip('{}').split('} {')
         paths = [p.strip() for p in paths]
         
+        try:
+            with self.open_export("extension_analysis", self.EXTENSION_EXPORT_FIELDS) as sink:
+                result = self.scan_extensions(paths, sink)
+        except (OSError, sqlite3.Error) as e:
+            self.update_status(f"❌ Export failed: {e}")
+            return
+        report = self.format_extension_report(paths, result, sink)
+        
+        # Display results
+        self.extension_text.config(state='normal')  # Enable for writing
+        self.extension_text.delete(1.0, tk.END)
+        self.extension_text.insert(tk.END, report)
+        self.extension_text.config(state='disabled')  # Make read-only again
+        self.extension_text.see('1.0')  # Scroll to top
+
+    def scan_extensions(self, paths, sink=None):
+        """
+        Aggregate file counts and sizes per extension below the given paths.
+        With a sink, one row per file is streamed to it and full path lists
+        are not kept, so memory stays constant for any tree size.
+        """
         # Dictionary to store extension analysis
         extension_analysis = {}
-        processed_files = set()  # Track processed files to avoid duplicates
+        mismatches = []  # (path, extension, detected extension)
+        archive_contents = {}  # member extension -> count and uncompressed size
+        result = {
+            'extensions': extension_analysis,
+            'archive_contents': archive_contents,
+            'mismatches': mismatches,
+            'mismatch_count': 0
+        }
+        sniff_content = self.config.get("sniff_content", True)
+        index_archives = self.config.get("index_archives", True)
         
         def analyze_file(path):
             try:
-                if path.is_file() and str(path) not in processed_files:
-                    processed_files.add(str(path))
-                    
+                if path.is_file():
                     ext = path.suffix.lower()
-                    if not ext:  # Skip files without extensions
-                        return
+                    detected = None
+                    if sniff_content:
+                        with self.stats.stage("sniff"):
+                            detected = self.sniffer.sniff(path)
+                    
+                    mismatch = False
+                    if not ext:
+                        # Group extensionless files by their detected type
+                        if not detected:
+                            return
+                        key = f"{detected} (detected, no extension)"
+                        mime_path = f"file{detected}"
+                    else:
+                        key = ext
+                        mime_path = str(path)
+                        mismatch = self.sniffer.is_mismatch(ext, detected)
+                        if mismatch:
+                            result['mismatch_count'] += 1
+                            if len(mismatches) < self.MAX_REPORTED_MISMATCHES:
+                                mismatches.append((path, ext, detected))
                     
-                    if ext not in extension_analysis:
-                        extension_analysis[ext] = {
+                    if key not in extension_analysis:
+                        extension_analysis[key] = {
                             'count': 0,
                             'total_size': 0,
                             'examples': [],
-                            'mime_type': mimetypes.guess_type(str(path))[0] or 'unknown',
+                            'mime_type': mimetypes.guess_type(mime_path)[0] or 'unknown',
                             'full_paths': []  # Add full paths for debugging
                         }
                     
-                    stats = extension_analysis[ext]
+                    stats = extension_analysis[key]
                     stats['count'] += 1
-                    stats['total_size'] += path.stat().st_size
+                    with self.stats.stage("stat"):
+                        size = path.stat().st_size
+                    stats['total_size'] += size
                     if len(stats['examples']) < 3 and path.name not in stats['examples']:
                         stats['examples'].append(path.name)
-                    stats['full_paths'].append(str(path))  # Store full path
+                    if sink is None:
+                        stats['full_paths'].append(str(path))  # Store full path
+                    else:
+                        sink.write((str(path), None, ext, detected, stats['mime_type'], size, mismatch))
+                    
+                    if index_archives and ext in self.archive_inspector.SUPPORTED:
+                        for name, member_ext, member_size in self.index_archive(path) or []:
+                            contents = archive_contents.setdefault(member_ext or '(none)', {
+                                'count': 0,
+                                'total_size': 0,
+                                'archives': 0,
+                                'last_archive': None
+                            })
+                            contents['count'] += 1
+                            contents['total_size'] += member_size or 0
+                            if contents['last_archive'] != path:
+                                contents['archives'] += 1
+                                contents['last_archive'] = path
+                            if sink is not None:
+                                sink.write((name, str(path), member_ext, None, None, member_size, False))
                     
                     self.update_status(f"Analyzed: {path.name}")
             except Exception as e:
                 self.update_status(f"Error analyzing {path}: {e}")
         
         # Process dropped items
-        for path_str in paths:
-            try:
-                path = Path(path_str).resolve()
-                if path.exists():
+        with self.stats.profiled(), self.stats.stage("analyze"):
+            for path in self.top_level_paths(paths):
+                try:
                     if path.is_file():
                         analyze_file(path)
                     elif path.is_dir():
                         self.update_status(f"Scanning directory: {path}")
-                        for item in path.rglob('*'):
+                        for item in self.io.scan(self.iter_folder_files(path, organize=False), path):
                             analyze_file(item)
-            except Exception as e:
-                self.update_status(f"Error processing {path_str}: {e}")
+                except Exception as e:
+                    self.update_status(f"Error processing {path}: {e}")
+        return result
+
+    def format_extension_report(self, paths, result, sink=None):
+        """Render extension analysis results as plain text"""
+        extension_analysis = result['extensions']
+        archive_contents = result['archive_contents']
+        mismatches = result['mismatches']
         
         # Generate report
         report = "Extension Analysis Report\n"
@@ -755,6 +2751,8 @@ class FileOrganizerApp:
         report += "Input Paths:\n"
         for path in paths:
             report += f"- {path}\n"
+        if sink is not None:
+            report += f"\nExported {sink.rows} rows to {sink.path}\n"
         report += "\n" + "=" * 50 + "\n\n"
         
         if not extension_analysis:
@@ -768,41 +2766,33 @@ class FileOrganizerApp:
                 report += "Example files:\n"
                 for example in stats['examples']:
                     report += f"  - {example}\n"
-                report += "Full paths:\n"
-                for path in stats['full_paths']:
-                    report += f"  > {path}\n"
+                if stats['full_paths']:
+                    report += "Full paths:\n"
+                    for path in stats['full_paths']:
+                        report += f"  > {path}\n"
                 report += "\n"
         
-        # Display results
-        self.extension_text.config(state='normal')  # Enable for writing
-        self.extension_text.delete(1.0, tk.END)
-        self.extension_text.insert(tk.END, report)
-        self.extension_text.config(state='disabled')  # Make read-only again
-        self.extension_text.see('1.0')  # Scroll to top
+        if archive_contents:
+            report += "=" * 50 + "\n\n"
+            report += "Archive Contents (not extracted):\n\n"
+            for ext, contents in sorted(archive_contents.items()):
+                report += f"Extension: {ext}\n"
+                report += f"Count: {contents['count']} files in {contents['archives']} archives\n"
+                report += f"Uncompressed Size: {contents['total_size'] / 1024 / 1024:.2f} MB\n\n"
+        
+        if mismatches:
+            report += "=" * 50 + "\n\n"
+            report += f"Content Mismatches ({result['mismatch_count']} files):\n"
+            for path, ext, detected in mismatches:
+                report += f"  ! {path} (named {ext}, contents look like {detected})\n"
+            if result['mismatch_count'] > len(mismatches):
+                report += f"  ... and {result['mismatch_count'] - len(mismatches)} more\n"
+        return report
 
     def analyze_sizes(self, event):
         """Analyze folder sizes from dropped folders"""
         raw_data = event.data
         
-        def get_size(path):
-            total = 0
-            try:
-                if path.is_file():
-                    return path.stat().st_size
-                for entry in path.rglob('*'):
-                    if entry.is_file():
-                        total += entry.stat().st_size
-            except Exception as e:
-                self.update_status(f"Error getting size for {path}: {e}")
-            return total
-        
-        def format_size(size):
-            for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
-                if size < 1024:
-                    return f"{size:.2f} {unit}"
-                size /= 1024
-            return f"{size:.2f} PB"
-        
         # Parse paths
         paths = []
         current_path = ""
@@ -828,66 +2818,461 @@ class FileOrganizerApp:
         if current_path.strip():
             paths.append(current_path.strip())
         
-        # Analyze sizes
-        results = []
-        for path_str in paths:
+        try:
+            with self.open_export("size_analysis", self.SIZE_EXPORT_FIELDS) as sink:
+                results = self.scan_sizes(paths, sink)
+        except (OSError, sqlite3.Error) as e:
+            self.update_status(f"❌ Export failed: {e}")
+            return
+        report = self.format_size_report(results, sink)
+        
+        # Display results
+        self.size_text.config(state='normal')  # Enable for writing
+        self.size_text.delete(1.0, tk.END)
+        self.size_text.insert(tk.END, report)
+        self.size_text.config(state='disabled')  # Make read-only again
+        self.size_text.see('1.0')  # Scroll to top
+
+    def scan_sizes(self, paths, sink=None):
+        """
+        Return [(path, size, archive contents size, archive count), ...] for
+        the given paths, largest first. With a sink, a row per file and a
+        total row per path are streamed to it during the scan.
+        """
+        index_archives = self.config.get("index_archives", True)
+        
+        def get_archive_size(path):
+            # Uncompressed size of archive members, read from the listing only
+            if not index_archives or path.suffix.lower() not in self.archive_inspector.SUPPORTED:
+                return None
+            members = self.index_archive(path)
+            if members is None:
+                return None
+            return sum(size or 0 for name, ext, size in members)
+        
+        def get_size(path):
+            # Returns (size on disk, uncompressed archive contents, archive count)
+            total = 0
+            contents = 0
+            archives = 0
             try:
-                path = Path(path_str).resolve()
-                if path.exists():
-                    size = get_size(path)
-                    results.append((path, size))
+                if path.is_file():
+                    entries = [path]
+                else:
+                    entries = self.io.scan(self.iter_folder_files(path, organize=False), path)
+                for entry in entries:
+                    try:
+                        if not entry.is_file():
+                            continue
+                        with self.stats.stage("stat"):
+                            size = entry.stat().st_size
+                    except OSError as e:
+                        self.update_status(f"Error getting size for {entry}: {e}")
+                        continue
+                    total += size
+                    # One unreadable archive must not cut the walk short
+                    try:
+                        archive_size = get_archive_size(entry)
+                    except Exception as e:
+                        self.update_status(f"Error reading archive {entry}: {e}")
+                        archive_size = None
+                    if archive_size is not None:
+                        contents += archive_size
+                        archives += 1
+                    if sink is not None:
+                        sink.write(('file', str(path), str(entry), size, archive_size))
             except Exception as e:
-                self.update_status(f"Error processing {path_str}: {e}")
+                self.update_status(f"Error getting size for {path}: {e}")
+            if sink is not None:
+                sink.write(('total', str(path), str(path), total, contents if archives else None))
+            return total, contents, archives
+        
+        # Analyze sizes
+        results = []
+        with self.stats.profiled(), self.stats.stage("analyze"):
+            for path_str in paths:
+                try:
+                    path = Path(path_str).resolve()
+                    if path.exists():
+                        results.append((path,) + get_size(path))
+                except Exception as e:
+                    self.update_status(f"Error processing {path_str}: {e}")
         
         # Sort results by size (largest first)
         results.sort(key=lambda x: x[1], reverse=True)
-        
+        return results
+
+    def format_size(self, size):
+        """Format a byte count with a human-readable unit"""
+        for unit in ['B', 'KB', 'MB', 'GB', 'TB']:
+            if size < 1024:
+                return f"{size:.2f} {unit}"
+            size /= 1024
+        return f"{size:.2f} PB"
+
+    def format_size_report(self, results, sink=None):
+        """Render size analysis results as plain text"""
         # Generate report
         report = "Folder Size Analysis\n"
         report += "=" * 50 + "\n\n"
+        if sink is not None:
+            report += f"Exported {sink.rows} rows to {sink.path}\n\n"
         
-        for path, size in results:
+        for path, size, contents, archives in results:
             report += f"{path.name}:\n"
-            report += f"  Size: {format_size(size)}\n"
+            report += f"  Size: {self.format_size(size)}\n"
+            if archives:
+                report += f"  Archive contents: {self.format_size(contents)} uncompressed in {archives} archives\n"
             report += f"  Path: {path}\n\n"
-        
-        # Display results
-        self.size_text.config(state='normal')  # Enable for writing
-        self.size_text.delete(1.0, tk.END)
-        self.size_text.insert(tk.END, report)
-        self.size_text.config(state='disabled')  # Make read-only again
-        self.size_text.see('1.0')  # Scroll to top
+        return report
 
-    def organize_folder(self, folder_path):
-        """Move entire folder to Folders category"""
+    def organize_folder(self, folder_path, item_id=None, root=None, plan=None):
+        """
+        Move entire folder to Folders category, or categorize its contents
+        file by file when recursive folder mode is enabled.
+        Returns the destination path, or None if the folder was not moved.
+        """
+        if self.config.get("recursive_folders", False):
+            return self.organize_folder_recursive(folder_path)
         try:
             self.update_status(f"Moving folder: {folder_path.name}")
-            dest_dir = self.base_dir / "Folders"
-            dest_dir.mkdir(parents=True, exist_ok=True)
-            dest_path = dest_dir / folder_path.name
-            
-            # Handle folder name conflicts
-            if dest_path.exists():
-                counter = 1
-                while dest_path.exists():
-                    new_name = f"{folder_path.name}_{counter}"
-                    dest_path = dest_dir / new_name
-                    counter += 1
+            if plan is None:
+                if root is None:
+                    root = self.choose_root("Folders", folder_path)
+                # Handle folder name conflicts
+                plan = self.reserve_destination(folder_path, "Folders", root=root)
+            category, dest_dir, dir_fd, name = plan
+            dest_path = dest_dir / name
             
             self.update_status(f"Moving folder to: {dest_path}")
-            shutil.move(str(folder_path), str(dest_path))
-            self.files_processed += 1
-            self.update_stats_display()
+            self.move_path(folder_path, dest_path, item_id, dir_fd)
+            with self.counter_lock:
+                self.files_processed += 1
             self.update_status(f"✓ Successfully moved folder to {dest_path}")
+            return dest_path
             
         except Exception as e:
             self.update_status(f"❌ Error moving folder {folder_path.name}: {str(e)}")
+        finally:
+            if plan is not None:
+                self.release_name(plan[1], plan[3])
+        return None
+
+    def iter_folder_files(self, folder_path, organize=True):
+        """
+        Stream the files of a tree depth-first with a scandir stack, without
+        listing it up front or remembering visited paths (unlike rglob).
+        When organizing, junk files are skipped, bundles (.app, .logicx,
+        .vst3) are yielded as single items and output roots inside the tree
+        are not entered, so organized files stay put. Otherwise every regular
+        file is yielded, as the analyzers need.
+        """
+        output_roots = {os.path.realpath(root) for root in self.output_roots} if organize else ()
+        stack = [str(folder_path)]
+        while stack:
+            current = stack.pop()
+            try:
+                with os.scandir(current) as entries:
+                    for entry in entries:
+                        if organize and entry.name in self.JUNK_FILES:
+                            continue
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                if organize and os.path.splitext(entry.name)[1].lower() in ['.app', '.logicx', '.vst3']:
+                                    yield Path(entry.path)
+                                elif entry.path not in output_roots:
+                                    stack.append(entry.path)
+                            elif organize or entry.is_file():
+                                yield Path(entry.path)
+                        except OSError:
+                            pass
+            except OSError as e:
+                self.update_status(f"❌ Error scanning {current}: {str(e)}")
+
+    def organize_folder_recursive(self, folder_path):
+        """
+        Categorize every file below a dropped folder with bounded parallel
+        moves, then prune the emptied source folders. Raises OSError with
+        the failure count if any file could not be moved, so the job item
+        is recorded as failed.
+        """
+        subcategory = folder_path.name if self.config.get("folder_subcategory", False) else None
+        max_workers = max(1, self.config.get("max_parallel_moves", 4))
+        results = {'moved': 0, 'failed': 0}
+        
+        def move(root, path, plan):
+            outcome = 'moved' if self.organize_file(path, subcategory=subcategory, root=root, plan=plan) else 'failed'
+            with self.counter_lock:
+                results[outcome] += 1
+        
+        self.update_status(f"Organizing contents of folder: {folder_path.name}")
+        # Bounded queues per volume keep memory flat on huge trees
+        volumes = VolumeQueues(self.output_roots, move, max_workers, max_workers * 4,
+                               self.io.enter_background, self.stats, self.update_status)
+        try:
+            for path in self.io.scan(self.iter_folder_files(folder_path), folder_path):
+                path = Path(path)
+                with self.stats.stage("categorize"):
+                    category = self.get_category(path)
+                root = self.choose_root(category, path)
+                try:
+                    plan = self.reserve_destination(path, category, subcategory, root)
+                except OSError as e:
+                    self.update_status(f"❌ Error processing {path.name}: {str(e)}")
+                    with self.counter_lock:
+                        results['failed'] += 1
+                    continue
+                volumes.submit(root, path, plan)
+        finally:
+            volumes.close()
+        
+        with self.stats.stage("prune"):
+            removed = self.prune_empty_dirs(folder_path)
+        self.update_status(
+            f"✓ Organized {results['moved']} files from {folder_path.name} "
+            f"({results['failed']} failed, {removed} empty folders removed)"
+        )
+        if results['failed']:
+            raise OSError(f"{results['failed']} of {results['moved'] + results['failed']} files could not be moved")
+        return self.base_dir
+
+    def prune_empty_dirs(self, folder_path):
+        """Remove folders left empty (or holding only junk files) in one bottom-up pass"""
+        output_roots = tuple(os.path.realpath(root) for root in self.output_roots)
+        removed = 0
+        for current, dirnames, filenames in os.walk(folder_path, topdown=False):
+            if any(name not in self.JUNK_FILES for name in filenames):
+                continue
+            # Leave output roots and their category folders alone
+            if current in output_roots or current.startswith(tuple(root + os.sep for root in output_roots)):
+                continue
+            try:
+                for name in filenames:
+                    os.unlink(os.path.join(current, name))
+                os.rmdir(current)
+                removed += 1
+            except OSError:
+                # Still holds subfolders or files that could not be moved
+                pass
+        return removed
+
+    def load_image_index(self):
+        """Build the BK-tree from all stored image hashes once per session"""
+        with self.image_index_lock:
+            if self.image_index is None:
+                index = BKTree()
+                with self.db_lock:
+                    rows = self.conn.execute("SELECT path, dhash FROM image_hashes").fetchall()
+                for path, dhash in rows:
+                    index.add(dhash & 0xFFFFFFFFFFFFFFFF, path)
+                self.image_index = index
+        return self.image_index
+
+    def hash_images(self, image_paths):
+        """
+        Return {path: dhash} for images, reusing stored hashes for unchanged
+        files and computing the rest in a process pool.
+        """
+        hashes = {}
+        stale = []
+        # Look up stored hashes a chunk at a time so checkpoints can run in between
+        for start in range(0, len(image_paths), self.JOB_CHECKPOINT_SIZE):
+            chunk = image_paths[start:start + self.JOB_CHECKPOINT_SIZE]
+            with self.db_lock:
+                rows = self.conn.execute(
+                    "SELECT path, size, mtime_ns, dhash FROM image_hashes WHERE path IN "
+                    f"({', '.join('?' * len(chunk))})",
+                    [path for path, st in chunk]
+                ).fetchall()
+            stored = {path: (size, mtime_ns, dhash) for path, size, mtime_ns, dhash in rows}
+            for path, st in chunk:
+                row = stored.get(path)
+                if row and row[0] == st.st_size and row[1] == st.st_mtime_ns:
+                    hashes[path] = row[2] & 0xFFFFFFFFFFFFFFFF
+                else:
+                    stale.append((path, st))
+        if not stale:
+            return hashes
+        
+        self.update_status(f"Hashing {len(stale)} images...")
+        index = self.load_image_index()
+        stats_by_path = dict(stale)
+        updates = []
+        
+        def flush():
+            with self.db_lock:
+                # SQLite integers are signed 64-bit
+                self.conn.executemany(
+                    "INSERT OR REPLACE INTO image_hashes (path, size, mtime_ns, dhash) VALUES (?, ?, ?, ?)",
+                    [(p, st.st_size, st.st_mtime_ns, h - (1 << 64) if h >= (1 << 63) else h)
+                     for p, st, h in updates]
+                )
+                self.conn.commit()
+            updates.clear()
+        
+        def throttled(batch):
+            # Workers read in other processes, so charge each file's budget before handing it out
+            for path in batch:
+                if self.io.enabled:
+                    self.io.throttle((self.io.device(path),), stats_by_path[path].st_size)
+                yield path
+        
+        done = 0
+        with ProcessPoolExecutor() as pool:
+            for start in range(0, len(stale), self.JOB_CHECKPOINT_SIZE):
+                batch = [path for path, st in stale[start:start + self.JOB_CHECKPOINT_SIZE]]
+                for path, dhash in pool.map(compute_dhash, throttled(batch), chunksize=64):
+                    done += 1
+                    if dhash is None:
+                        continue
+                    hashes[path] = dhash
+                    updates.append((path, stats_by_path[path], dhash))
+                    with self.image_index_lock:
+                        index.add(dhash, path)
+                flush()
+                self.update_status(f"Hashed {done}/{len(stale)} images")
+        return hashes
+
+    def find_similar_images(self, event):
+        """Group dropped images with near-duplicates from the hash index"""
+        raw_data = event.data
+        paths = [p.strip() for p in raw_data.strip('{}').split('} {')]
+        radius = self.config.get("near_duplicate_distance", 6)
+        
+        def process():
+            try:
+                # Collect image files with their stat for cache validation
+                image_paths = []
+                for path_str in paths:
+                    try:
+                        path = Path(path_str).resolve()
+                        if path.is_dir():
+                            candidates = self.io.scan(self.iter_folder_files(path, organize=False), path)
+                        else:
+                            candidates = [path]
+                        for item in candidates:
+                            if item.suffix.lower() in self.IMAGE_EXTENSIONS:
+                                try:
+                                    image_paths.append((str(item), item.stat()))
+                                except OSError:
+                                    pass
+                    except Exception as e:
+                        self.update_status(f"Error processing {path_str}: {e}")
+                self.update_status(f"Found {len(image_paths)} images")
+                
+                with self.stats.stage("phash"):
+                    hashes = self.hash_images(image_paths)
+                index = self.load_image_index()
+                
+                # Union-find over matches so chains of similar images form one group
+                parent = {}
+                
+                def find(item):
+                    parent.setdefault(item, item)
+                    while parent[item] != item:
+                        parent[item] = parent[parent[item]]
+                        item = parent[item]
+                    return item
+                
+                with self.stats.stage("bktree"):
+                    for path, dhash in hashes.items():
+                        with self.image_index_lock:
+                            matches = index.search(dhash, radius)
+                        for distance, other in matches:
+                            # The tree may still hold an older hash for a re-hashed file
+                            if other in hashes and (hashes[other] ^ dhash).bit_count() > radius:
+                                continue
+                            if other != path and os.path.exists(other):
+                                parent[find(other)] = find(path)
+                
+                groups = {}
+                for item in parent:
+                    groups.setdefault(find(item), []).append(item)
+                groups = sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+                
+                report = "Similar Images Report\n"
+                report += "=" * 50 + "\n\n"
+                report += f"Images checked: {len(hashes)}\n"
+                report += f"Indexed images: {index.size}\n"
+                report += f"Max distance: {radius} bits\n\n"
+                if not groups:
+                    report += "No near-duplicates found.\n"
+                for number, group in enumerate(groups, 1):
+                    report += f"Group {number} ({len(group)} images):\n"
+                    for item in sorted(group):
+                        report += f"  > {item}\n"
+                    report += "\n"
+                
+                self.root.after(0, self.show_similar_report, report)
+                self.update_status(f"Found {len(groups)} groups of similar images")
+            except Exception as e:
+                # e.g. BrokenProcessPool if a worker died while decoding
+                self.update_status(f"❌ Error finding similar images: {e}")
+                report = "Similar Images Report\n"
+                report += "=" * 50 + "\n\n"
+                report += f"Error: {e}\n"
+                self.root.after(0, self.show_similar_report, report)
+        
+        threading.Thread(target=process, daemon=True).start()
+
+    def show_similar_report(self, report):
+        """Display the near-duplicate report"""
+        self.similar_text.config(state='normal')  # Enable for writing
+        self.similar_text.delete(1.0, tk.END)
+        self.similar_text.insert(tk.END, report)
+        self.similar_text.config(state='disabled')  # Make read-only again
+        self.similar_text.see('1.0')  # Scroll to top
 
 def main():
+    parser = argparse.ArgumentParser(description="Smart file organization tool")
+    parser.add_argument("--stats", action="store_true",
+                        help="collect per-stage pipeline timings")
+    parser.add_argument("--profile", action="store_true",
+                        help="also run pipelines under cProfile (implies --stats)")
+    parser.add_argument("--stats-json", metavar="PATH",
+                        help="write collected stats as JSON to PATH on exit")
+    parser.add_argument("--analyze", choices=["extensions", "sizes"],
+                        help="run an analyzer on PATHS without opening the window")
+    parser.add_argument("--export", metavar="FILE",
+                        help="stream analyzer rows to FILE (.jsonl, .csv or .db)")
+    parser.add_argument("paths", nargs="*", help="files or folders to analyze")
+    args = parser.parse_args()
+    if not args.analyze and (args.export or args.paths):
+        parser.error("--export and paths need --analyze")
+    
+    stats = None
+    if args.stats or args.profile or args.stats_json:
+        stats = PipelineStats(enabled=True, profile=args.profile)
+    
+    if args.analyze:
+        app = FileOrganizerApp(None, stats=stats)
+        if args.analyze == "extensions":
+            table, fields = "extension_analysis", app.EXTENSION_EXPORT_FIELDS
+        else:
+            table, fields = "size_analysis", app.SIZE_EXPORT_FIELDS
+        try:
+            export = ExportSink(args.export, table, fields) if args.export else contextlib.nullcontext()
+        except ValueError as e:
+            parser.error(str(e))
+        with export as sink:
+            if args.analyze == "extensions":
+                report = app.format_extension_report(args.paths, app.scan_extensions(args.paths, sink), sink)
+            else:
+                report = app.format_size_report(app.scan_sizes(args.paths, sink), sink)
+        print(report)
+        if args.stats_json:
+            app.stats.dump_json(args.stats_json)
+        return
+    
     root = TkinterDnD.Tk()
     root.title("Advanced File Organizer")
-    app = FileOrganizerApp(root)
-    root.mainloop()
+    app = FileOrganizerApp(root, stats=stats)
+    try:
+        root.mainloop()
+    finally:
+        if args.stats_json:
+            app.stats.dump_json(args.stats_json)
+            print(f"Stats written to {args.stats_json}")
 
 if __name__ == "__main__":
     main()
\ No newline at end of file